@@ -0,0 +1,135 @@
+#基准：原来逐次读文件的dv解析器（dvfile 0.2.0的opendv），仅用于速度对比
+#与原版相比只有一处改动：整数按标准大小的'<l'读取，原版的'l'在64位Linux上为8字节，无法读取
+import struct
+import numpy
+from dvfile import Dvfile,Dvtrack,Dvsegment,Dvnote,Dvinst
+
+def skreadint(file)->int:
+    return struct.unpack("<l",file.read(4))[0]
+
+def skreadbytes(file)->bytes:
+    return file.read(skreadint(file))
+
+def skreadstr(file)->str:
+    try:
+        return str(skreadbytes(file),encoding="utf8")
+    except UnicodeDecodeError:#如果字符串不能用unicode解码，则返回空字符串，而不会导致程序直接退出
+        return ""
+
+def opendv(filename:str)->Dvfile:
+    '''
+    打开sk或dv文件，返回Dvfile对象
+    '''
+    from dvfile.data import balanceread
+    with open(filename,"rb") as file:
+        #文件头
+        file.read(48)
+        #读曲速标记
+        tempo=[]
+        for i in range(0,skreadint(file)):
+            tempo+=[(skreadint(file),skreadint(file)/100)]
+        file.read(4)
+        #读节拍标记
+        beats=[]
+        for i in range(0,skreadint(file)):
+            beats+=[(skreadint(file),skreadint(file),skreadint(file))]
+        track=[]
+        inst=[]
+        for i in range(0,skreadint(file)):#读音轨
+            tracktype=skreadint(file)#合成音轨0，伴奏1
+            if(tracktype==0):#合成音轨
+                trackname=skreadstr(file)
+                mute=(file.read(1)==b'\x01')
+                solo=(file.read(1)==b'\x01')
+                volume=skreadint(file)
+                balance=balanceread.get(file.read(4),0)#左右声道平衡
+                file.read(4)#区段占用空间
+                segment=[]
+                for i in range(0,skreadint(file)):#读区段
+                    segstart=skreadint(file)
+                    seglength=skreadint(file)
+                    segname=skreadstr(file)
+                    singer=skreadstr(file)
+                    file.read(4)#音符占用空间
+                    note=[]
+                    for i in range(0,skreadint(file)):#读音符
+                        start=skreadint(file)
+                        length=skreadint(file)
+                        notenum=115-skreadint(file)
+                        viblen=skreadint(file)#颤音长度
+                        pinyin=skreadstr(file)
+                        hanzi=skreadstr(file)
+                        file.read(1)
+                        #以下是数据块1,包含颤音幅度线和颤音速度线
+                        data1=numpy.fromfile(file,"<i4",skreadint(file)//4)#未知数据块1,包含滑音幅度线和频率线
+                        vibamp=data1[2:2+data1[1]*2].reshape([-1,2])#颤音幅度线
+                        data1=data1[2+data1[1]*2:]
+                        vibfre=data1[2:2+data1[1]*2].reshape([-1,2])#颤音速度线
+                        data1=data1[2+data1[1]*2:]
+                        vibp=data1[2:2+data1[1]*2].reshape([-1,2])
+                        vibp[:,1]=-vibp[:,1]#渲染出的颤音音高曲线
+                        #以上是未知数据块1
+                        data2=skreadbytes(file)#未知数据块2
+                        file.read(18)#音素
+                        bendep=skreadint(file)#弯曲深度
+                        benlen=skreadint(file)#弯曲长度
+                        portail=skreadint(file)#尾部滑音长度
+                        porhead=skreadint(file)#头部滑音长度
+                        timbre=skreadint(file)#音阶
+                        crolrc=skreadstr(file)#交叉拼音
+                        crotim=skreadint(file)#交叉音阶
+                        note+=[Dvnote(start,
+                                      length,
+                                      notenum,
+                                      pinyin,
+                                      hanzi,
+                                      benlen,
+                                      bendep,
+                                      porhead,
+                                      portail,
+                                      timbre,
+                                      viblen,
+                                      vibamp,
+                                      vibfre,
+                                      vibp,
+                                      crolrc,
+                                      crotim)]
+                    #以下是区段参数
+                    #音量Volume，取值范围[0,256]
+                    vol=numpy.fromfile(file,"<i4",skreadint(file)//4)[1:].reshape([-1,2])
+                    #return numpy.fromfile(file,"<i4",skreadint(file)//4)
+                    #音调Pitch，以音分为单位，转换成midi标准的100倍，0表示按默认音调
+                    pit=numpy.fromfile(file,"<i4",skreadint(file)//4)[1:].reshape([-1,2])
+                    sgn=(numpy.sign(pit[:,1])+1)//2
+                    pit[:,1]=sgn*(11550-pit[:,1])
+                    skreadbytes(file)
+                    #气声Breathness，取值范围[0,256]
+                    bre=numpy.fromfile(file,"<i4",skreadint(file)//4)[1:].reshape([-1,2])
+                    #声线（性别）Gender，取值范围[0,256]
+                    gen=numpy.fromfile(file,"<i4",skreadint(file)//4)[1:].reshape([-1,2])
+                    skreadbytes(file)
+                    skreadbytes(file)
+                    segment+=[Dvsegment(segstart,
+                                        seglength,
+                                        segname,
+                                        singer,
+                                        note,
+                                        vol=vol,
+                                        pit=pit,
+                                        bre=bre,
+                                        gen=gen)]
+                track+=[Dvtrack(trackname,segment,volume,balance,mute,solo)]
+            else:#伴奏音轨
+                trackname=skreadstr(file)
+                mute=(file.read(1)==b'\x01')
+                solo=(file.read(1)==b'\x01')
+                volume=skreadint(file)
+                file.read(4)#左右声道平衡
+                file.read(4)#区段占用空间
+                if(skreadint(file)>0):#如果为0，则为空伴奏音轨
+                    segstart=skreadint(file)
+                    seglength=skreadint(file)
+                    skreadstr(file)
+                    fname=skreadstr(file)
+                    inst+=[Dvinst(segstart,seglength,fname,trackname,volume,mute,solo)]
+    return Dvfile(tempo=tempo,beats=beats,track=track,inst=inst)
@@ -0,0 +1,23 @@
+#opendv读取速度测试：比较原来逐次读文件的解析器（见baseline_reader.py）与整个文件读入内存、内存映射两种读取方式
+#用法：python benchmark/opendv_benchmark.py [重复次数]
+import os
+import sys
+import glob
+import timeit
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),".."))
+import dvfile
+import baseline_reader
+
+def main():
+    number=int(sys.argv[1]) if len(sys.argv)>1 else 20
+    docs=os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","docs")
+    for filename in sorted(glob.glob(os.path.join(docs,"zhiyaopingfan*.dv"))):
+        t0=timeit.timeit(lambda:baseline_reader.opendv(filename),number=number)/number
+        t1=timeit.timeit(lambda:dvfile.opendv(filename),number=number)/number
+        t2=timeit.timeit(lambda:dvfile.opendv(filename,mmap=True),number=number)/number
+        print("{}  baseline:{:.2f}ms  file:{:.2f}ms x{:.1f}  mmap:{:.2f}ms x{:.1f}".format(
+            os.path.basename(filename),t0*1000,t1*1000,t0/t1,t2*1000,t0/t2))
+
+if(__name__=="__main__"):
+    main()
@@ -1,14 +1,18 @@
 __version__='0.2.0'
 
 
+import bisect
 import copy
+import functools
 import math
+import operator
+import os
 import numpy
 import struct
 from typing import List,Tuple,Dict,Union
 
 def skreadint(file)->int:
-    return struct.unpack("l",file.read(4))[0]
+    return struct.unpack("<l",file.read(4))[0]
 
 def skreadbytes(file)->bytes:
     return file.read(skreadint(file))
@@ -23,7 +27,7 @@ def skwritebool(n:bool)->bytes:
     return bytes([int(n)])
 
 def skwriteint(n:int)->bytes:
-    return struct.pack("l",n)
+    return struct.pack("<l",n)
 
 def skwritebytes(s:bytes)->bytes:
     return skwriteint(len(s))+s
@@ -37,6 +41,219 @@ def skwritearray(ar:numpy.ndarray)->bytes:
 def skwritelist(l:list)->bytes:
     return skwritebytes(skwriteint(len(l))+b"".join([bytes(n) for n in l]))
 
+skint=struct.Struct("<l")
+
+class Skreader():
+    '''
+    sk/dv数据读取器，在一块内存上按偏移量解码，不复制数据
+    buf:数据，支持缓冲区协议的任意对象（bytes，bytearray，mmap等）
+    pos:当前读取位置，int
+    '''
+    def __init__(self,buf,pos:int=0):
+        self.buf=memoryview(buf)
+        self.pos:int=pos
+
+    def skip(self,n:int):
+        self.pos+=n
+
+    def readint(self)->int:
+        n=skint.unpack_from(self.buf,self.pos)[0]
+        self.pos+=4
+        return n
+
+    def readbool(self)->bool:
+        b=(self.buf[self.pos]==1)
+        self.pos+=1
+        return b
+
+    def readbytes(self)->memoryview:
+        #返回的是原数据的切片，不复制
+        n=self.readint()
+        b=self.buf[self.pos:self.pos+n]
+        self.pos+=n
+        return b
+
+    def readstr(self)->str:
+        try:
+            return str(self.readbytes(),encoding="utf8")
+        except UnicodeDecodeError:
+            return ""
+
+    def readarray(self,n:int)->numpy.ndarray:
+        #读n个点的曲线，返回原数据上的视图，形状为(n,2)
+        ar=numpy.frombuffer(self.buf,"<i4",n*2,self.pos).reshape([-1,2])
+        self.pos+=n*8
+        return ar
+
+    def readparam(self)->numpy.ndarray:
+        #读区段参数曲线：占用空间，点数，点
+        size=self.readint()
+        end=self.pos+size
+        self.skip(4)
+        ar=self.readarray((size-4)//8)
+        self.pos=end
+        return ar
+
+    def readblock(self)->"Skblock":
+        #读带长度前缀的数据块，只记录其位置，不解码
+        size=self.readint()
+        block=Skblock(self.buf,self.pos,self.pos+size)
+        self.pos+=size
+        return block
+
+class Skblock():
+    '''
+    源数据中一段尚未解码的数据块，用于延迟解码
+    buf:源数据，memoryview
+    start:起点，int
+    end:终点，int
+    复制（包括deepcopy）时不复制源数据
+    '''
+    def __init__(self,buf:memoryview,start:int,end:int):
+        self.buf=buf
+        self.start:int=start
+        self.end:int=end
+
+    def __len__(self):
+        return self.end-self.start
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self,memo):
+        return self
+
+    def reader(self)->Skreader:
+        return Skreader(self.buf,self.start)
+
+    def getvalue(self)->memoryview:
+        return self.buf[self.start:self.end]
+
+class Skwriter():
+    '''
+    sk/dv数据写入器，数据依次写入bytearray，大块的只读数据（固定数据、未修改的源数据）只保存引用，不复制
+    输出由若干数据块依次拼接而成，写入文件时逐块写出
+    长度前缀先写占位，数据块写完后再回填
+    file:为None时只写入内存；否则缓冲的数据超过buffersize时写入文件，file需支持seek
+    buffersize:写入文件时的缓冲区大小，int
+    simplify:各曲线的化简容差，如{"pit":2,"vol":0}，见curvetolerance，为None时不化简
+    report:化简统计，{曲线名:[原点数,删除点数]}
+    '''
+    sharedsize:int=256#不短于此长度的只读数据按引用写入
+
+    def __init__(self,file=None,buffersize:int=1<<20,simplify:Dict[str,float]=None):
+        self.buf=bytearray()
+        self.file=file
+        self.buffersize:int=buffersize
+        self.base:int=0#尚未写出的第一个数据块在输出中的位置
+        self.start:int=0#buf[0]在输出中的位置
+        self.chunks:list=[]#buf之前尚未写出的数据块
+        self.bufs:List[bytearray]=[]#chunks中的bytearray，用于回填长度
+        self.bufstarts:List[int]=[]#bufs中各块在输出中的位置
+        self.simplify:Dict[str,float]=simplify
+        self.report:Dict[str,List[int]]={}
+
+    def tell(self)->int:
+        return self.start+len(self.buf)
+
+    def write(self,b):
+        self.buf+=b
+        if(self.file is not None and self.tell()-self.base>=self.buffersize):
+            self.flush()
+
+    def writeshared(self,b):
+        '''
+        写入只读数据b（bytes或memoryview），较长时只保存引用，b在写出前不能被修改
+        '''
+        if(len(b)<self.sharedsize):
+            self.write(b)
+            return
+        if(len(self.buf)>0):
+            self.chunks.append(self.buf)
+            self.bufs.append(self.buf)
+            self.bufstarts.append(self.start)
+            self.start+=len(self.buf)
+            self.buf=bytearray()
+        self.chunks.append(b)
+        self.start+=len(b)
+        if(self.file is not None and self.start-self.base>=self.buffersize):
+            self.flush()
+
+    def writeint(self,n:int):
+        self.buf+=skint.pack(n)
+
+    def writeints(self,*n:int):
+        self.buf+=struct.pack("<{}l".format(len(n)),*n)
+
+    def writebool(self,n:bool):
+        self.buf.append(int(n))
+
+    def writebytes(self,b):
+        self.writeint(len(b))
+        self.write(b)
+
+    def writestr(self,s:str):
+        self.writebytes(bytes(s,"utf8"))
+
+    def writearray(self,ar:numpy.ndarray):
+        ar=numpy.asarray(ar,dtype="<i4")
+        self.writeints(ar.nbytes+4,ar.shape[0])
+        self.write(ar.tobytes())
+
+    def curve(self,name:str,ar):
+        '''
+        返回要写入的曲线，设置了simplify时返回化简后的曲线，不修改原曲线
+        '''
+        if(self.simplify is None or name not in self.simplify):
+            return ar
+        return simplifycurve(ar,self.simplify[name],name,self.report)
+
+    def writelist(self,l:list):
+        pos=self.begin()
+        self.writeint(len(l))
+        for i in l:
+            i.writeto(self)
+        self.end(pos)
+
+    def begin(self)->int:
+        #写入长度占位，返回占位的位置
+        pos=self.tell()
+        self.buf+=b"\0\0\0\0"
+        return pos
+
+    def end(self,pos:int):
+        #回填pos处的长度占位
+        n=self.tell()-pos-4
+        if(pos>=self.start):
+            skint.pack_into(self.buf,pos-self.start,n)
+        elif(pos>=self.base):#占位在之前的数据块中
+            i=bisect.bisect_right(self.bufstarts,pos)-1
+            skint.pack_into(self.bufs[i],pos-self.bufstarts[i],n)
+        else:#占位已写入文件
+            self.file.seek(pos)
+            self.file.write(skint.pack(n))
+            self.file.seek(self.base)
+
+    def dump(self,file):
+        '''
+        将尚未写出的数据逐块写入file
+        '''
+        file.writelines(self.chunks)
+        file.write(self.buf)
+
+    def flush(self):
+        if(self.file is not None):
+            self.dump(self.file)
+            self.start+=len(self.buf)
+            self.base=self.start
+            self.buf=bytearray()
+            self.chunks=[]
+            self.bufs=[]
+            self.bufstarts=[]
+
+    def getvalue(self)->bytes:
+        return b"".join(self.chunks+[self.buf])
+
 def intquantize(n:int,d:int)->int:
     #将n四舍五入到d的整数倍
     return int(n/d+0.5)*d
@@ -47,18 +264,349 @@ def deleteemptystr(l:List[str]):
         l.pop()
 
 def cutparam(ar:numpy.ndarray,length:int,default:int,head:bool=True,tail:bool=True)->numpy.ndarray:
-    l,r=numpy.interp((0,length),ar[:,0],ar[:,1]).astype(numpy.int)
-    if(head):
-        ar=ar[ar[:,0]>0]
-        ar=numpy.append([[-1,default],
-                         [0,l]],ar,axis=0)
-    if(tail):
-        ar=ar[ar[:,0]<length]
-        ar=numpy.append(ar,[[length,r],
-                           [length+1,default]],axis=0)
+    #见Dvcurve.cut
+    return Dvcurve(ar).cut(length,default,head,tail).points
+
+def curvetolerance(cents:float=2,value:float=0)->Dict[str,float]:
+    '''
+    各曲线的化简容差
+    cents:pit与vibp的容差，音分
+    value:vol、bre、gen、vibamp、vibfre的容差，默认为0，即只删除共线的点
+    '''
+    return {"pit":cents,"vibp":cents,"vol":value,"bre":value,"gen":value,"vibamp":value,"vibfre":value}
+
+def simplifycurve(ar,tolerance:float,name:str,report:Dict[str,List[int]])->"Dvcurve":
+    '''
+    化简曲线ar（见Dvcurve.simplify），并将(原点数,删除点数)累加到report[name]
+    '''
+    curve=Dvcurve(ar).simplify(tolerance)
+    count=report.setdefault(name,[0,0])
+    count[0]+=len(ar)
+    count[1]+=len(ar)-len(curve)
+    return curve
+
+notestateattr=operator.attrgetter("start","length","notenum","viblen","pinyin","hanzi","bendep","benlen","portail","porhead","timbre","crolrc","crotim")
+
+def notecontent(n)->bytes:
+    #音符的颤音曲线与固定数据的内容
+    return b"".join((n.vibamp.tobytes(),n.vibfre.tobytes(),n.vibp.tobytes(),b"" if n.fixed is None else n.fixed.tobytes()))
+
+def notestate(note:list)->list:
+    '''
+    记录各音符的属性，用于判断音符是否被修改
+    颤音曲线与固定数据记录对象本身及其内容，替换为其他数组或直接修改数组内容（包括deepcopy后的副本）都能被检测到
+    '''
+    get=notestateattr
+    return [(get(n),n.vibamp,n.vibfre,n.vibp,n.fixed,notecontent(n)) for n in note]
+
+def samenotestate(note:list,state:list)->bool:
+    '''
+    各音符的属性是否与notestate记录的相同
+    '''
+    get=notestateattr
+    for (n,(attr,vibamp,vibfre,vibp,fixed,content)) in zip(note,state):
+        if(get(n)!=attr or n.vibamp is not vibamp or n.vibfre is not vibfre or n.vibp is not vibp or n.fixed is not fixed):
+            return False
+        if(notecontent(n)!=content):
+            return False
+    return True
+
+def rangeindex(start:numpy.ndarray,length:numpy.ndarray)->Tuple[numpy.ndarray,numpy.ndarray,numpy.ndarray]:
+    '''
+    将多个区间[start,start+length)展开并拼接成一个下标数组
+    返回：(下标,所属区间的编号,在所属区间内的位置)
+    '''
+    length=numpy.maximum(length,0)
+    group=numpy.repeat(numpy.arange(len(length)),length)
+    offset=numpy.arange(len(group))-numpy.repeat(numpy.cumsum(length)-length,length)
+    return start[group]+offset,group,offset
+
+def paint(ar:numpy.ndarray,index:numpy.ndarray,value:numpy.ndarray):
+    '''
+    ar[index]=value，index中有重复时以后出现的为准，超出ar范围的下标被忽略
+    '''
+    keep=(index>=0)&(index<len(ar))
+    index=index[keep]
+    value=value[keep]
+    if(numpy.all(index[1:]>index[:-1])):#没有重复
+        ar[index]=value
+    else:
+        #稳定排序后每组相同下标中的最后一个即为最后写入的值
+        #index由若干递增段拼接而成，timsort对这种数据接近线性
+        order=numpy.argsort(index,kind="stable")
+        index=index[order]
+        last=numpy.append(index[1:]!=index[:-1],True)
+        ar[index[last]]=value[order][last]
+
+def objectarray(l:list)->numpy.ndarray:
+    '''
+    将列表转为一维object数组，即使列表元素是形状相同的数组也不会合并成多维数组
+    '''
+    ar=numpy.empty(len(l),dtype=object)
+    for (i,v) in enumerate(l):
+        ar[i]=v
     return ar
 
+def porcurve(k:numpy.ndarray,n:numpy.ndarray,y1,y2)->numpy.ndarray:
+    '''
+    正弦滑音曲线：从y1滑到y2，共n点，返回第k点的值，各参数均可为数组
+    '''
+    ls=k*((math.pi/2-(-math.pi/2))/n)+(-math.pi/2)
+    return (y1+y2)/2+(y2-y1)/2*numpy.sin(ls)
+
+def groupinterp(q:numpy.ndarray,qgroup:numpy.ndarray,xp:numpy.ndarray,fp:numpy.ndarray,xpcount:numpy.ndarray)->numpy.ndarray:
+    '''
+    分组的numpy.interp(q,xp,fp,left=0,right=0)，所有组一次完成
+    q:查询点，必须为非负整数，按组拼接
+    qgroup:每个查询点所属的组
+    xp,fp:各组的曲线按组拼接，每组内xp升序
+    xpcount:每组曲线的点数
+    '''
+    if(len(q)==0):
+        return numpy.zeros(0)
+    xpgroup=numpy.repeat(numpy.arange(len(xpcount)),xpcount)
+    xpoffset=numpy.cumsum(xpcount)-xpcount
+    #q为整数，xp<=q等价于ceil(xp)<=q，把(组,ceil(xp))编码成整数后一次searchsorted
+    m=int(q.max())+2
+    key=xpgroup*m+numpy.clip(numpy.ceil(xp),0,m-1).astype(numpy.int64)
+    count=numpy.searchsorted(key,qgroup*m+q,side="right")-xpoffset[qgroup]#每个查询点所在组中xp<=q的点数
+    result=numpy.zeros(len(q))
+    inside=(count>0)&(count<xpcount[qgroup])
+    j=xpoffset[qgroup[inside]]+count[inside]-1
+    x=q[inside]
+    slope=(fp[j+1]-fp[j])/(xp[j+1]-xp[j])
+    result[inside]=numpy.where(xp[j]==x,fp[j],slope*(x-xp[j])+fp[j])
+    #与numpy.interp相同，恰好落在最后一个点上时取该点的值
+    last=(count==xpcount[qgroup])&(count>0)
+    j=xpoffset[qgroup[last]]+count[last]-1
+    result[last]=numpy.where(xp[j]==q[last],fp[j],0)
+    return result
+
+class Dvcurve():
+    '''
+    dv参数曲线，按x排序的折线，用于区段的vol、pit、bre、gen
+    x:各点位置，numpy.array
+    y:各点取值，numpy.array
+    points:numpy.array([[x,y]])
+    可以像numpy.array([[x,y]])一样使用，例如curve[:,1]+=100、numpy.asarray(curve)
+    '''
+    def __init__(self,points=None):
+        if(points is None):
+            points=numpy.zeros((0,2),dtype=numpy.int64)
+        elif(isinstance(points,Dvcurve)):
+            points=points.points
+        points=numpy.asarray(points).reshape([-1,2])
+        x=points[:,0]
+        if(numpy.any(x[1:]<x[:-1])):
+            points=points[numpy.argsort(x,kind="stable")]
+        self.x:numpy.ndarray=numpy.ascontiguousarray(points[:,0])
+        self.y:numpy.ndarray=numpy.ascontiguousarray(points[:,1])
+
+    @staticmethod
+    def constant(length:int,value:int)->"Dvcurve":
+        '''
+        长度为length的区段上取值恒为value的曲线
+        '''
+        return Dvcurve(numpy.array([[-1,value],[length+1,value]],dtype=numpy.int64))
+
+    @property
+    def points(self)->numpy.ndarray:
+        return numpy.column_stack((self.x,self.y))
+
+    @property
+    def shape(self)->Tuple[int,int]:
+        return (len(self.x),2)
+
+    def __len__(self):
+        return len(self.x)
+
+    def __iter__(self):
+        return iter(self.points)
+
+    def __array__(self,dtype=None,copy=None):
+        return numpy.asarray(self.points,dtype=dtype)
+
+    def __getitem__(self,key):
+        return self.points[key]
+
+    def __setitem__(self,key,value):
+        points=self.points
+        points[key]=value
+        self.x=points[:,0].copy()
+        self.y=points[:,1].copy()
+
+    def __repr__(self):
+        return "Dvcurve({})".format(self.points.tolist())
+
+    def copy(self)->"Dvcurve":
+        return Dvcurve(self.points)
+
+    def index(self,t)->int:
+        '''
+        返回位置不大于t的最后一个点的下标，t在所有点之前时返回-1，二分查找
+        '''
+        return int(numpy.searchsorted(self.x,t,side="right"))-1
+
+    def at(self,t,left=None,right=None)->float:
+        '''
+        单点取值，与numpy.interp(t,x,y,left,right)相同，二分查找，O(log n)
+        '''
+        j=self.index(t)
+        if(j<0):
+            return float(self.y[0] if left is None else left)
+        if(j>=len(self.x)-1):
+            if(t==self.x[-1]):
+                return float(self.y[-1])
+            return float(self.y[-1] if right is None else right)
+        (x0,x1)=(int(self.x[j]),int(self.x[j+1]))
+        (y0,y1)=(int(self.y[j]),int(self.y[j+1]))
+        return (y1-y0)/(x1-x0)*(t-x0)+y0
+
+    def sample(self,t,left=None,right=None)->numpy.ndarray:
+        '''
+        在位置数组t上批量取值，与numpy.interp(t,x,y,left,right)相同
+        '''
+        return numpy.interp(t,self.x,self.y,left=left,right=right)
+
+    def resample(self,t)->"Dvcurve":
+        '''
+        在位置数组t（如等间隔的tick）上重新采样，返回新曲线，取值截断为整数
+        '''
+        t=numpy.asarray(t,dtype=numpy.int64)
+        return Dvcurve(numpy.column_stack((t,self.sample(t).astype(numpy.int64))))
+
+    def slice(self,start:int,end:int)->"Dvcurve":
+        '''
+        截取[start,end]部分，两端补上插值点，返回新曲线
+        '''
+        (l,r)=self.sample((start,end)).astype(numpy.int64)
+        inner=(self.x>start)&(self.x<end)
+        return Dvcurve(numpy.concatenate(([[start,l]],numpy.column_stack((self.x[inner],self.y[inner])),[[end,r]])))
+
+    def shift(self,dx:int)->"Dvcurve":
+        '''
+        返回整体平移dx后的新曲线
+        '''
+        return Dvcurve(numpy.column_stack((self.x+dx,self.y)))
+
+    def cut(self,length:int,default:int,head:bool=True,tail:bool=True)->"Dvcurve":
+        '''
+        切去区段[0,length]以外的无效参数，返回新曲线
+        head:是否切去区段开头的无效参数,bool
+        tail:是否切去区段结尾的无效参数,bool
+        '''
+        (l,r)=self.sample((0,length)).astype(numpy.int64)
+        ar=self.points
+        if(head):
+            ar=ar[ar[:,0]>0]
+            ar=numpy.append([[-1,default],
+                             [0,l]],ar,axis=0)
+        if(tail):
+            ar=ar[ar[:,0]<length]
+            ar=numpy.append(ar,[[length,r],
+                               [length+1,default]],axis=0)
+        return Dvcurve(ar)
+
+    @staticmethod
+    def merge(curves:List["Dvcurve"],
+              offsets:List[int],
+              lengths:List[int],
+              length:int,
+              default:int)->"Dvcurve":
+        '''
+        将多个区段的参数曲线合并为一条曲线
+        curves:各区段的参数曲线
+        offsets:各区段相对于合并后区段起点的位置
+        lengths:各区段的长度
+        length:合并后区段的长度
+        default:无参数处的默认值
+        每个区段只保留[0,长度)内的部分，与后一区段重叠的部分以后一区段为准，区段之间的空隙为默认值
+        '''
+        def gap(a:int,b:int):
+            #[a,b)内为默认值
+            if(b-1>a):
+                pieces.append(numpy.array([[a,default],[b-1,default]],dtype=numpy.int64))
+            elif(b>a):
+                pieces.append(numpy.array([[a,default]],dtype=numpy.int64))
+        pieces=[numpy.array([[-1,default]],dtype=numpy.int64)]
+        end=0#已填充到的位置
+        n=len(curves)
+        for i in range(n):
+            a=offsets[i]
+            b=a+lengths[i]
+            if(i+1<n):
+                b=min(b,offsets[i+1])
+            w=b-a
+            if(w<=0):
+                continue
+            #与前一区段之间（或合并后区段开头）有空隙时，空隙内为默认值
+            gap(end,a)
+            curve=Dvcurve(curves[i])
+            if(w>1):
+                piece=curve.slice(0,w-1).points.astype(numpy.int64)
+            else:
+                piece=numpy.array([[0,int(curve.at(0))]],dtype=numpy.int64)
+            piece[:,0]+=a
+            pieces.append(piece)
+            end=max(end,b)
+        gap(end,length)
+        pieces.append(numpy.array([[length+1,default]],dtype=numpy.int64))
+        return Dvcurve(numpy.concatenate(pieces))
+
+    def simplify(self,tolerance:float)->"Dvcurve":
+        '''
+        Douglas-Peucker折线化简：删除去掉后竖直方向误差不超过tolerance的点，首尾两点总是保留
+        返回新曲线
+        '''
+        n=len(self.x)
+        if(n<=2):
+            return self.copy()
+        x=self.x.astype(numpy.float64)
+        y=self.y.astype(numpy.float64)
+        keep=numpy.zeros(n,dtype=bool)
+        keep[0]=keep[-1]=True
+        stack=[(0,n-1)]
+        while(stack):
+            (i,j)=stack.pop()
+            if(j-i<2):
+                continue
+            if(x[j]==x[i]):
+                err=numpy.abs(y[i+1:j]-y[i])
+            else:
+                err=numpy.abs(y[i]+(x[i+1:j]-x[i])*((y[j]-y[i])/(x[j]-x[i]))-y[i+1:j])
+            k=int(numpy.argmax(err))
+            if(err[k]>tolerance):
+                k+=i+1
+                keep[k]=True
+                stack.append((i,k))
+                stack.append((k,j))
+        return Dvcurve(numpy.column_stack((self.x[keep],self.y[keep])))
+
 #dv文件
+#音符的默认颤音曲线，使用默认值的音符共用这些数组，不要原地修改
+defaultvibamp=numpy.array([[-1,0],[100001,0]])
+defaultvibfre=numpy.array([[-1,0],[100001,0]])
+defaultvibp=numpy.array([[0,0]])
+
+def writevib(w:Skwriter,vibamp,vibfre,vibp):
+    #写入数据块1，包含颤音幅度线、颤音速度线和渲染出的颤音音高曲线
+    v=numpy.array(vibp,dtype="<i4")
+    v[:,1]=-v[:,1]
+    pos=w.begin()
+    w.writearray(vibamp)
+    w.writearray(vibfre)
+    w.writearray(v)
+    w.end(pos)
+
+def encodevib(vibamp,vibfre,vibp)->bytes:
+    #返回编码后的数据块1
+    w=Skwriter()
+    writevib(w,vibamp,vibfre,vibp)
+    return w.getvalue()
+
+#默认颤音曲线编码后的数据块1，写入时直接复制
+defaultvib:bytes=encodevib(defaultvibamp,defaultvibfre,defaultvibp)
+
 class Dvnote():
     '''
     dv音符类    
@@ -78,6 +626,8 @@ class Dvnote():
     vibp:渲染出的颤音音高曲线，numpy.array([[x,y]])，单位：（毫秒，音分），每10ms采样一次
     crolrc:交叉拼音，str
     crotim:交叉音阶，int
+    fixed:数据块2与音素的源数据（含长度前缀），为源文件上的numpy.uint8视图，写入时原样写回，
+        为None时写入默认值，读取时与默认值相同的也记为None，不占用内存
     '''
     def __init__(self,start:int,
                  length:int,
@@ -90,11 +640,12 @@ class Dvnote():
                  portail:int=20,
                  timbre:int=-1,
                  viblen:int=0,
-                 vibamp:numpy.array=numpy.array([[-1,0],[100001,0]]),
-                 vibfre:numpy.array=numpy.array([[-1,0],[100001,0]]),
-                 vibp:numpy.array=numpy.array([[0,0]]),
+                 vibamp:numpy.array=defaultvibamp,
+                 vibfre:numpy.array=defaultvibfre,
+                 vibp:numpy.array=defaultvibp,
                  crolrc:str="",
-                 crotim:int=-1):
+                 crotim:int=-1,
+                 fixed:numpy.ndarray=None):
         self.start=start
         self.length=length
         self.notenum=notenum
@@ -111,6 +662,7 @@ class Dvnote():
         self.vibp=vibp
         self.crolrc=crolrc
         self.crotim=crotim
+        self.fixed=fixed
     
     def __str__(self):
         return "   {} {} {} {} {}\n".format(
@@ -121,30 +673,249 @@ class Dvnote():
             self.pinyin)
     
     def __bytes__(self):
-        from dvfile.data import data2
-        v=self.vibp
-        v[:,1]=-v[:,1]
-        b=(skwriteint(self.start)
-           +skwriteint(self.length)
-           +skwriteint(115-self.notenum)
-           +skwriteint(self.viblen)
-           +skwritestr(self.pinyin)
-           +skwritestr(self.hanzi)
-           +b'\x00'
-           +skwritebytes(skwritearray(self.vibamp)
-                        +skwritearray(self.vibfre)
-                        +skwritearray(v))
-           +data2
-           +b'\x00\x00\x00\x80?\x00\x00\x00\x80?\x00\x00\x80?\x00\x00\x80?'#音素
-           +skwriteint(self.bendep)
-           +skwriteint(self.benlen)
-           +skwriteint(self.portail)
-           +skwriteint(self.porhead)
-           +skwriteint(self.timbre)
-           +skwritestr(self.crolrc)
-           +skwriteint(self.crotim))
-        return b
-    
+        w=Skwriter()
+        self.writeto(w)
+        return w.getvalue()
+
+    def writeto(self,w:Skwriter):
+        '''
+        将音符写入Skwriter，默认颤音曲线与固定数据不重新编码
+        '''
+        from dvfile.data import notefixed
+        w.writeints(self.start,
+                    self.length,
+                    115-self.notenum,
+                    self.viblen)
+        w.writestr(self.pinyin)
+        w.writestr(self.hanzi)
+        w.write(b'\x00')
+        if(self.vibamp is defaultvibamp and self.vibfre is defaultvibfre and self.vibp is defaultvibp and w.simplify is None):
+            w.write(defaultvib)
+        else:
+            writevib(w,w.curve("vibamp",self.vibamp),w.curve("vibfre",self.vibfre),w.curve("vibp",self.vibp))
+        w.writeshared(notefixed if self.fixed is None else self.fixed)#数据块2与音素
+        w.writeints(self.bendep,
+                    self.benlen,
+                    self.portail,
+                    self.porhead,
+                    self.timbre)
+        w.writestr(self.crolrc)
+        w.writeint(self.crotim)
+
+def intcolumn(name:str)->property:
+    #音符表中整数列对应的行属性
+    def get(self)->int:
+        return int(getattr(self.table,name)[self.index])
+    def set(self,value:int):
+        getattr(self.table,name)[self.index]=value
+    return property(get,set)
+
+def lyriccolumn(name:str)->property:
+    #音符表中歌词列对应的行属性，歌词以编号形式存储
+    def get(self)->str:
+        return self.table.lyrics[getattr(self.table,name)[self.index]]
+    def set(self,value:str):
+        getattr(self.table,name)[self.index]=self.table.intern(value)
+    return property(get,set)
+
+def objectcolumn(name:str)->property:
+    #音符表中曲线列对应的行属性
+    def get(self)->numpy.ndarray:
+        return getattr(self.table,name)[self.index]
+    def set(self,value:numpy.ndarray):
+        getattr(self.table,name)[self.index]=value
+    return property(get,set)
+
+class Dvnoterow(Dvnote):
+    '''
+    音符表中一行的视图，可以当作Dvnote使用，读写属性时直接读写音符表
+    table:所在的音符表，Dvnotetable
+    index:行号，int
+    音符表排序、过滤后行号会变化，此前取得的视图不再有效
+    '''
+    def __init__(self,table:"Dvnotetable",index:int):
+        self.table=table
+        self.index:int=index
+
+    start=intcolumn("start")
+    length=intcolumn("length")
+    notenum=intcolumn("notenum")
+    benlen=intcolumn("benlen")
+    bendep=intcolumn("bendep")
+    porhead=intcolumn("porhead")
+    portail=intcolumn("portail")
+    timbre=intcolumn("timbre")
+    viblen=intcolumn("viblen")
+    crotim=intcolumn("crotim")
+    pinyin=lyriccolumn("pinyin")
+    hanzi=lyriccolumn("hanzi")
+    crolrc=lyriccolumn("crolrc")
+    vibamp=objectcolumn("vibamp")
+    vibfre=objectcolumn("vibfre")
+    vibp=objectcolumn("vibp")
+    fixed=objectcolumn("fixed")
+
+class Dvnotetable():
+    '''
+    dv音符表，按列存储一个区段中的音符，可以代替音符列表作为Dvsegment.note
+    start,length,notenum,benlen,bendep,porhead,portail,timbre,viblen,crotim:整数列，numpy.array
+    pinyin,hanzi,crolrc:歌词列，存储的是歌词在lyrics中的编号，numpy.array
+    lyrics:歌词表，相同的歌词只存一次，List[str]
+    vibamp,vibfre,vibp:颤音曲线列，元素为numpy.array的object数组
+    fixed:数据块2与音素列，见Dvnote.fixed，object数组
+    按下标访问单个音符时返回Dvnoterow视图，按切片、bool数组或下标数组访问时返回新的音符表
+    '''
+    intcolumns=("start","length","notenum","benlen","bendep","porhead","portail","timbre","viblen","crotim")
+    lyriccolumns=("pinyin","hanzi","crolrc")
+    objectcolumns=("vibamp","vibfre","vibp","fixed")
+
+    def __init__(self,note:List[Dvnote]=[]):
+        self.lyrics:List[str]=[]
+        self.lyricindex:Dict[str,int]={}
+        ints=numpy.array(list(map(operator.attrgetter(*self.intcolumns),note)),dtype=numpy.int64).reshape([-1,len(self.intcolumns)])
+        for (i,name) in enumerate(self.intcolumns):
+            setattr(self,name,ints[:,i].copy())
+        for name in self.lyriccolumns:
+            setattr(self,name,numpy.fromiter(map(self.intern,map(operator.attrgetter(name),note)),numpy.int64,len(note)))
+        for name in self.objectcolumns:
+            setattr(self,name,objectarray(list(map(operator.attrgetter(name),note))))
+
+    def intern(self,lyric:str)->int:
+        '''
+        返回歌词在歌词表中的编号，歌词表中没有则添加
+        '''
+        i=self.lyricindex.get(lyric)
+        if(i is None):
+            i=len(self.lyrics)
+            self.lyrics.append(lyric)
+            self.lyricindex[lyric]=i
+        return i
+
+    def lyricmask(self,s,use_hanzi:bool=False)->numpy.ndarray:
+        '''
+        返回每个音符的歌词是否属于集合/列表/元组/字符串s，bool数组
+        每种歌词只判断一次
+        '''
+        inset=numpy.array([i in s for i in self.lyrics],dtype=bool)
+        return inset[self.getlyric(use_hanzi)]
+
+    def __len__(self):
+        return len(self.start)
+
+    def __getitem__(self,key):
+        if(isinstance(key,(int,numpy.integer))):
+            if(key<0):
+                key+=len(self)
+            if(not 0<=key<len(self)):
+                raise IndexError("note index out of range")
+            return Dvnoterow(self,int(key))
+        return self.take(numpy.arange(len(self))[key])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield Dvnoterow(self,i)
+
+    def __iadd__(self,note):
+        return self.extend(note)
+
+    def take(self,index:numpy.ndarray)->"Dvnotetable":
+        '''
+        按下标数组取出若干行，返回新的音符表，歌词表共用
+        '''
+        t=Dvnotetable()
+        t.lyrics=self.lyrics
+        t.lyricindex=self.lyricindex
+        for name in self.intcolumns+self.lyriccolumns+self.objectcolumns:
+            setattr(t,name,getattr(self,name)[index])
+        return t
+
+    def extend(self,note):
+        '''
+        在表尾添加音符，note为Dvnote列表或音符表
+        '''
+        if(not isinstance(note,Dvnotetable)):
+            note=Dvnotetable(list(note))
+        #将歌词编号转换到本表的歌词表
+        code=numpy.array([self.intern(i) for i in note.lyrics],dtype=numpy.int64)
+        for name in self.intcolumns+self.objectcolumns:
+            setattr(self,name,numpy.append(getattr(self,name),getattr(note,name)))
+        for name in self.lyriccolumns:
+            setattr(self,name,numpy.append(getattr(self,name),code[getattr(note,name)]))
+        return self
+
+    def append(self,note:Dvnote):
+        return self.extend([note])
+
+    @staticmethod
+    def fromcolumns(**columns)->"Dvnotetable":
+        '''
+        由列直接构建音符表，必须给出start，未给出的列取Dvnote的默认值
+        整数列为数组或列表，歌词列为字符串列表
+        例如：Dvnotetable.fromcolumns(start=[0,480],length=[480,480],notenum=[60,62],pinyin=["a","b"])
+        '''
+        n=len(columns["start"])
+        proto=Dvnote(start=0,length=0,notenum=60,pinyin="",hanzi="")
+        t=Dvnotetable()
+        for name in t.intcolumns:
+            if(name in columns):
+                setattr(t,name,numpy.asarray(columns[name],dtype=numpy.int64))
+            else:
+                setattr(t,name,numpy.full(n,getattr(proto,name),dtype=numpy.int64))
+        for name in t.lyriccolumns:
+            if(name in columns):
+                setattr(t,name,numpy.fromiter(map(t.intern,columns[name]),numpy.int64,n))
+            else:
+                setattr(t,name,numpy.full(n,t.intern(getattr(proto,name)),dtype=numpy.int64))
+        for name in t.objectcolumns:
+            setattr(t,name,objectarray(columns.get(name,[getattr(proto,name)]*n)))
+        return t
+
+    @staticmethod
+    def concat(tables:List["Dvnotetable"],offsets:List[int])->"Dvnotetable":
+        '''
+        将多个音符表首尾相接，第i个表的音符开始时间加上offsets[i]，返回新的音符表
+        每列只拼接一次，颤音曲线与原表共用
+        '''
+        t=Dvnotetable()
+        for name in t.intcolumns+t.objectcolumns:
+            setattr(t,name,numpy.concatenate([getattr(t,name)]+[getattr(i,name) for i in tables]))
+        t.start=numpy.concatenate([t.start[:0]]+[i.start+o for (i,o) in zip(tables,offsets)])
+        #将歌词编号转换到新表的歌词表
+        codes=[numpy.array([t.intern(l) for l in i.lyrics],dtype=numpy.int64) for i in tables]
+        for name in t.lyriccolumns:
+            setattr(t,name,numpy.concatenate([getattr(t,name)]+[code[getattr(i,name)] for (i,code) in zip(tables,codes)]))
+        return t
+
+    def tolist(self)->List[Dvnote]:
+        '''
+        转换为独立的Dvnote列表
+        '''
+        return [Dvnote(start=n.start,
+                       length=n.length,
+                       notenum=n.notenum,
+                       pinyin=n.pinyin,
+                       hanzi=n.hanzi,
+                       benlen=n.benlen,
+                       bendep=n.bendep,
+                       porhead=n.porhead,
+                       portail=n.portail,
+                       timbre=n.timbre,
+                       viblen=n.viblen,
+                       vibamp=n.vibamp,
+                       vibfre=n.vibfre,
+                       vibp=n.vibp,
+                       crolrc=n.crolrc,
+                       crotim=n.crotim,
+                       fixed=n.fixed) for n in self]
+
+    def getlyric(self,use_hanzi:bool=False)->numpy.ndarray:
+        '''
+        返回歌词列（歌词编号数组），默认为拼音，如果需要使用汉字，use_hanzi=True
+        '''
+        if(use_hanzi):
+            return self.hanzi
+        return self.pinyin
+
 class Dvsegment():
     '''
     dv区段类
@@ -153,10 +924,15 @@ class Dvsegment():
     name:区段名，str
     singer:音源名，str
     note:音符列表
-    vol：音量Volume，取值范围[0,256]，numpy.array([[x,y]])
-    pit：音调Pitch，以音分为单位，转换成midi标准的100倍，0表示按默认音调，numpy.array([[x,y]])
-    bre：气声Breathness，取值范围[0,256]，numpy.array([[x,y]])
-    gen：声线（性别）Gender，取值范围[0,256]，numpy.array([[x,y]])
+    noteblock:音符列表在源数据中的位置，Skblock，仅在延迟解码时使用，note第一次被访问时才解码
+    sourceblock:区段在源数据中的位置，Skblock，从文件读取的区段才有，见ischanged
+    sourcenote,sourcestate:解码时的音符列表与各音符的属性，用于判断音符是否被修改
+    sourceheader,sourceparam:解码时的(起点,长度,区段名,音源名)与(vol,pit,bre,gen)曲线的点，用于判断区段是否被修改
+    vol：音量Volume，取值范围[0,256]，Dvcurve
+    pit：音调Pitch，以音分为单位，转换成midi标准的100倍，0表示按默认音调，Dvcurve
+    bre：气声Breathness，取值范围[0,256]，Dvcurve
+    gen：声线（性别）Gender，取值范围[0,256]，Dvcurve
+    vol、pit、bre、gen可以直接赋值为numpy.array([[x,y]])，将自动转为Dvcurve
     '''
     def __init__(self,start:int,
                  length:int,
@@ -173,25 +949,76 @@ class Dvsegment():
         self.length:int=length
         self.name:str=name
         self.singer:str=singer
+        self.noteblock:Skblock=None
+        self.sourceblock:Skblock=None
+        self.sourcenote:List[Dvnote]=None
+        self.sourcestate:list=None
+        self.sourceheader:tuple=None
+        self.sourceparam:tuple=None
         self.note:List[Dvnote]=note
         NoneType=type(None)
         if(type(vol)==NoneType):
-            self.vol=numpy.array([[-1,128],[length+1,128]])
+            self.vol=Dvcurve.constant(length,128)
         else:
             self.vol=vol
         if(type(pit)==NoneType):
-            self.pit=numpy.array([[-1,-1],[length+1,-1]])
+            self.pit=Dvcurve.constant(length,-1)
         else:
             self.pit=pit
         if(type(bre)==NoneType):
-            self.bre=numpy.array([[-1,128],[length+1,128]])
+            self.bre=Dvcurve.constant(length,128)
         else:
             self.bre=bre
         if(type(gen)==NoneType):
-            self.gen=numpy.array([[-1,128],[length+1,128]])
+            self.gen=Dvcurve.constant(length,128)
         else:
             self.gen=gen
+
+    @property
+    def vol(self)->Dvcurve:
+        return self._vol
+
+    @vol.setter
+    def vol(self,vol):
+        self._vol=vol if isinstance(vol,Dvcurve) else Dvcurve(vol)
+
+    @property
+    def pit(self)->Dvcurve:
+        return self._pit
+
+    @pit.setter
+    def pit(self,pit):
+        self._pit=pit if isinstance(pit,Dvcurve) else Dvcurve(pit)
+
+    @property
+    def bre(self)->Dvcurve:
+        return self._bre
+
+    @bre.setter
+    def bre(self,bre):
+        self._bre=bre if isinstance(bre,Dvcurve) else Dvcurve(bre)
+
+    @property
+    def gen(self)->Dvcurve:
+        return self._gen
+
+    @gen.setter
+    def gen(self,gen):
+        self._gen=gen if isinstance(gen,Dvcurve) else Dvcurve(gen)
         
+    @property
+    def note(self)->List[Dvnote]:
+        if(self._note is None):
+            r=self.noteblock.reader()
+            self._note=[readdvnote(r) for i in range(r.readint())]
+            self.sourcenote=self._note
+            self.sourcestate=notestate(self._note)
+        return self._note
+
+    @note.setter
+    def note(self,note:List[Dvnote]):
+        self._note=note
+
     def __str__(self):
         s="  segment {} {} {} {}\n".format(
             self.start,
@@ -203,38 +1030,92 @@ class Dvsegment():
         return s
     
     def __bytes__(self):
-        pit=self.pit
+        w=Skwriter()
+        self.writeto(w)
+        return w.getvalue()
+
+    def ischanged(self)->bool:
+        '''
+        区段在读取后是否被修改，没有源数据（不是从文件读取）的区段总是返回True
+        比较区段属性、vol、pit、bre、gen与解码时是否相同，以及各音符的属性与解码时是否相同
+        音符的颤音曲线被替换为其他数组时视为已修改，直接修改vibp数组的内容也会被检测到
+        按列存储（Dvnotetable）的区段总是视为已修改
+        '''
+        if(self.sourceblock is None):
+            return True
+        note=self._note
+        if(note is not None):
+            if(note is not self.sourcenote or len(note)!=len(self.sourcestate)):
+                return True
+            if(not samenotestate(note,self.sourcestate)):
+                return True
+        if((self.start,self.length,self.name,self.singer)!=self.sourceheader):
+            return True
+        for (curve,points) in zip((self.vol,self.pit,self.bre,self.gen),self.sourceparam):
+            src=Dvcurve(points)
+            if(not (numpy.array_equal(curve.x,src.x) and numpy.array_equal(curve.y,src.y))):
+                return True
+        return False
+
+    def writeto(self,w:Skwriter):
+        '''
+        将区段写入Skwriter，未修改的区段直接复制源数据
+        '''
+        if(w.simplify is None and not self.ischanged()):
+            w.writeshared(self.sourceblock.getvalue())
+            return
+        pit=numpy.array(w.curve("pit",self.pit),dtype="<i4")
         sgn=(numpy.sign(pit[:,1])+1)//2
         pit[:,1]=(sgn-1)+sgn*(11550-pit[:,1])
-        b=(skwriteint(self.start)
-           +skwriteint(self.length)
-           +skwritestr(self.name)
-           +skwritestr(self.singer)
-           +skwritelist(self.note)
-           +skwritearray(self.vol)
-           +skwritearray(pit)
-           +skwritearray(numpy.array([[-1,128],[self.length+1,128]]))
-           +skwritearray(self.bre)
-           +skwritearray(self.gen)
-           +skwritearray(numpy.array([[-1,128],[self.length+1,128]]))
-           +skwritearray(numpy.array([[-1,0],[self.length+1,128]]))
-           )
-        return b
+        w.writeints(self.start,self.length)
+        w.writestr(self.name)
+        w.writestr(self.singer)
+        w.writelist(self.note)
+        w.writearray(w.curve("vol",self.vol))
+        w.writearray(pit)
+        w.writearray(numpy.array([[-1,128],[self.length+1,128]]))
+        w.writearray(w.curve("bre",self.bre))
+        w.writearray(w.curve("gen",self.gen))
+        w.writearray(numpy.array([[-1,128],[self.length+1,128]]))
+        w.writearray(numpy.array([[-1,0],[self.length+1,128]]))
     
     def __add__(self,other):
         #两个区段相加可合并区段
         #self为上一区段，other为下一区段
-        deltatime=other.start-self.start#时间差
-        seg=Dvsegment(start=self.start,
-                      name=self.name,
-                      singer=self.singer,
-                      length=deltatime+other.length,
-                      note=copy.deepcopy(self.note))
-        notes=copy.deepcopy(other.note)
-        for i in notes:
-            i.start+=deltatime
-        seg.note+=notes
-        return seg
+        return Dvsegment.concat([self,other])
+
+    @staticmethod
+    def concat(segments:List["Dvsegment"])->"Dvsegment":
+        '''
+        按顺序合并多个区段，返回新区段，每个音符只复制一次
+        起点、区段名、音源名取自第一个区段，长度到最后一个区段的结尾为止
+        音符开始时间换算到新区段的起点；任一区段按列存储时结果为Dvnotetable，否则为Dvnote列表
+        合并后的音符与原区段共用颤音曲线数组
+        vol、pit、bre、gen曲线换算到新区段的起点后合并（见Dvcurve.merge），区段之间的空隙为默认值
+        '''
+        first=segments[0]
+        last=segments[-1]
+        offsets=[seg.start-first.start for seg in segments]
+        length=last.start-first.start+last.length
+        if(any(isinstance(seg.note,Dvnotetable) for seg in segments)):
+            note=Dvnotetable.concat([seg.note if isinstance(seg.note,Dvnotetable) else Dvnotetable(seg.note) for seg in segments],offsets)
+        else:
+            note=[]
+            for (seg,offset) in zip(segments,offsets):
+                for n in seg.note:
+                    n=copy.copy(n)
+                    n.start+=offset
+                    note.append(n)
+        lengths=[seg.length for seg in segments]
+        return Dvsegment(start=first.start,
+                         length=length,
+                         name=first.name,
+                         singer=first.singer,
+                         note=note,
+                         vol=Dvcurve.merge([seg.vol for seg in segments],offsets,lengths,length,128),
+                         pit=Dvcurve.merge([seg.pit for seg in segments],offsets,lengths,length,-1),
+                         bre=Dvcurve.merge([seg.bre for seg in segments],offsets,lengths,length,128),
+                         gen=Dvcurve.merge([seg.gen for seg in segments],offsets,lengths,length,128))
 
     def __radd__(self,other):
         #为适配sum，规定：其他类型+Dvsegment返回原Dvsegment的副本
@@ -251,7 +1132,19 @@ class Dvsegment():
             note.start-=delta
         #参数移动
         for param in (self.pit,self.vol,self.bre,self.gen):
-            param[:,0]-=delta
+            param.x-=delta
+        return self
+
+    def columnar(self,on:bool=True):
+        '''
+        切换区段中音符的存储方式
+        on=True:音符列表转为按列存储的Dvnotetable，sort、cut、quantize、filter、filterout、transpose、fixnoteoverlap将按列批量计算
+        on=False:转回Dvnote列表
+        '''
+        if(on and not isinstance(self.note,Dvnotetable)):
+            self.note=Dvnotetable(self.note)
+        elif(not on and isinstance(self.note,Dvnotetable)):
+            self.note=self.note.tolist()
         return self
 
     def getlyric(self,use_hanzi:bool=False,ignore:set=set())->List[str]:
@@ -260,6 +1153,10 @@ class Dvsegment():
         默认使用dv文件中的拼音，如果需要使用汉字，use_hanzi=True
         ignore：忽略的歌词。例如如果想忽略连音符，则ignore={"-"}
         '''
+        if(isinstance(self.note,Dvnotetable)):
+            t=self.note
+            code=t.getlyric(use_hanzi)[~t.lyricmask(ignore,use_hanzi)]
+            return [t.lyrics[i] for i in code]
         lyrics=[]
         if(use_hanzi):
             for n in self.note:
@@ -275,6 +1172,9 @@ class Dvsegment():
         '''
         音符按开始时间排序
         '''
+        if(isinstance(self.note,Dvnotetable)):
+            self.note=self.note.take(numpy.lexsort((self.note.notenum,self.note.start)))
+            return self
         self.note=sorted(self.note,key=lambda x:(x.start,x.notenum))
         return self
         
@@ -285,6 +1185,14 @@ class Dvsegment():
         head:是否切去开始时间为负数的音符,bool
         tail:是否切去结束时间大于区段长度的音符,bool
         '''
+        if(isinstance(self.note,Dvnotetable)):
+            if(head):
+                i=numpy.flatnonzero(self.note.start>=0)
+                self.note=self.note[(i[0] if len(i) else len(self.note)-1):]
+            if(tail):
+                i=numpy.flatnonzero(self.note.start+self.note.length<=self.length)
+                self.note=self.note[:(i[-1] if len(i) else 0)+1]
+            return self
         if(head):
             for i in range(0,len(self.note)):
                 if(self.note[i].start>=0):
@@ -303,10 +1211,27 @@ class Dvsegment():
         head:是否切去区段开头的无效参数,bool
         tail:是否切去区段结尾的无效参数,bool
         """
-        self.vol=cutparam(ar=self.vol,length=self.length,default=128,head=head,tail=tail)
-        self.pit=cutparam(ar=self.pit,length=self.length,default=0,head=head,tail=tail)
-        self.bre=cutparam(ar=self.bre,length=self.length,default=128,head=head,tail=tail)
-        self.gen=cutparam(ar=self.gen,length=self.length,default=128,head=head,tail=tail)
+        self.vol=self.vol.cut(length=self.length,default=128,head=head,tail=tail)
+        self.pit=self.pit.cut(length=self.length,default=0,head=head,tail=tail)
+        self.bre=self.bre.cut(length=self.length,default=128,head=head,tail=tail)
+        self.gen=self.gen.cut(length=self.length,default=128,head=head,tail=tail)
+        return self
+
+    def simplify(self,cents:float=2,value:float=0,report:Dict[str,List[int]]=None):
+        """
+        化简vol、pit、bre、gen与颤音曲线，删除误差在容差以内的点（见Dvcurve.simplify）
+        cents:pit与vibp的容差，音分
+        value:vol、bre、gen、vibamp、vibfre的容差，默认为0，即只删除共线的点
+        report:化简统计，若给出，将{曲线名:[原点数,删除点数]}累加到其中
+        """
+        if(report is None):
+            report={}
+        tolerance=curvetolerance(cents,value)
+        for name in ("vol","pit","bre","gen"):
+            setattr(self,name,simplifycurve(getattr(self,name),tolerance[name],name,report))
+        for note in self.note:
+            for name in ("vibamp","vibfre","vibp"):
+                setattr(note,name,simplifycurve(getattr(note,name),tolerance[name],name,report).points)
         return self
     
     def fixnoteoverlap(self):
@@ -316,6 +1241,14 @@ class Dvsegment():
         起点不同的重叠音符，截取前一个音符的重叠部分
         """
         self.sort()#按开始时间排序
+        if(isinstance(self.note,Dvnotetable)):
+            t=self.note
+            if(len(t)>0):
+                nextstart=t.start[1:]
+                keep=numpy.append(t.start[:-1]<nextstart,True)#如果音符开始时间相同，则不输出。
+                t.length[:-1]=numpy.where(keep[:-1],numpy.minimum(t.length[:-1],nextstart-t.start[:-1]),t.length[:-1])
+                self.note=t[keep]
+            return self
         newnotelist=[]
         for (i,note) in enumerate(self.note[:-1]):
             nextnote=self.note[i+1]
@@ -342,6 +1275,14 @@ class Dvsegment():
         将所有音符的边界四舍五入到d的整数倍，过短的音符将被删除。
         例如，如果需要量化到八分音符，请使用seg.quantize(240)
         '''
+        if(isinstance(self.note,Dvnotetable)):
+            t=self.note
+            start=numpy.trunc((self.start+t.start)/d+0.5).astype(numpy.int64)*d
+            end=numpy.trunc((self.start+t.start+t.length)/d+0.5).astype(numpy.int64)*d
+            t.start=start-self.start
+            t.length=end-start
+            self.note=t[end>start]
+            return self
         note_new=[]
         for n in self.note:
             start=intquantize(self.start+n.start,d)
@@ -353,13 +1294,23 @@ class Dvsegment():
         self.note=note_new
         return self
     
-    def filter(self,f):
+    def filter(self,f,vectorized:bool=False):
         '''
         按函数过滤区段中的音符
         输入：函数f，它只接受一个Dvnote类型的输入，且输出为bool
         func将在所有音符上作用一遍，保留返回True的那些音符，其他音符将被删除
+        vectorized:为True时，f只调用一次，输入为整个区段的Dvnotetable，输出为每个音符是否保留的bool数组
         '''
-        self.note=list(filter(f,self.note))
+        if(vectorized):
+            if(isinstance(self.note,Dvnotetable)):
+                self.note=self.note[numpy.asarray(f(self.note),dtype=bool)]
+            else:
+                keep=f(Dvnotetable(self.note))
+                self.note=[n for (n,k) in zip(self.note,keep) if k]
+        elif(isinstance(self.note,Dvnotetable)):
+            self.note=self.note[numpy.fromiter(map(f,self.note),bool,len(self.note))]
+        else:
+            self.note=list(filter(f,self.note))
         return self
 
     def filterout(self,s,use_hanzi:bool=False):
@@ -368,7 +1319,9 @@ class Dvsegment():
         输入：集合/列表/元组/字符串s，若音符歌词属于s，则删除该音符
         默认使用拼音，如需使用汉字，use_hanzi=True
         '''
-        if(use_hanzi):
+        if(isinstance(self.note,Dvnotetable)):
+            self.note=self.note[~self.note.lyricmask(s,use_hanzi)]
+        elif(use_hanzi):
             self.note=[n for n in self.note if not(n.hanzi in s)]
         else:
             self.note=[n for n in self.note if not(n.pinyin in s)]
@@ -379,73 +1332,105 @@ class Dvsegment():
         对dv区段移调
         n：移调半音数，向上为正，向下为负。
         """
-        for note in self.note:
-            note.notenum+=n
-        sgn=(numpy.sign(self.pit[:,1])+1)//2
-        self.pit[:,1]+=sgn*n*100
+        if(isinstance(self.note,Dvnotetable)):
+            self.note.notenum+=n
+        else:
+            for note in self.note:
+                note.notenum+=n
+        #只移动编辑过（大于0）的部分
+        self.pit.y+=(self.pit.y>0)*(n*100)
         return self
 
-    def basicpitch(self,tempolist:List[Tuple[int,float]]):
+    def basicpitch(self,tempolist:Union[List[Tuple[int,float]],"Dvtempomap"]):
         """
         计算音轨的基础音高曲线
+        tempolist:曲速标记列表或Dvtempomap（如Dvfile.tempomap()）
+        所有音符的滑音、弯音、颤音按列批量计算，每个音符按其起点处的曲速计算
         """
-        #暂不支持变速曲
-        tempo=tempolist[0][1]
-        tps=8*tempo
         bp=numpy.zeros(self.length)
+        t=self.note if isinstance(self.note,Dvnotetable) else Dvnotetable(self.note)
+        if(len(t)==0):
+            return bp
+        if(not isinstance(tempolist,Dvtempomap)):
+            tempolist=Dvtempomap(tempolist)
+        tempo=tempolist.bpmat(self.start+t.start)
+        tps=8*tempo
+        start=t.start
+        length=t.length
+        notenum=t.notenum
+        end=start+length
         #有音符部分的基本音高
-        for n in self.note:
-            bp[n.start:n.start+n.length]=100*n.notenum
+        if(start[0]>=0 and end[-1]<=self.length and numpy.all(start[1:]>=end[:-1])):
+            #音符依次排列且不重叠时，整段曲线由休止和音符交替拼成
+            gap=start-numpy.append(0,end[:-1])
+            bp[:end[-1]]=numpy.repeat(numpy.stack((numpy.zeros(len(t)),100*notenum),axis=1).ravel(),
+                                      numpy.stack((gap,length),axis=1).ravel())
+        else:
+            index,group,offset=rangeindex(start,length)
+            paint(bp,index,100*notenum[group])
         #开头、结尾
-        bp[0:self.note[0].start]=100*self.note[0].notenum
-        bp[self.note[-1].start:]=100*self.note[-1].notenum
+        bp[0:start[0]]=100*notenum[0]
+        bp[start[-1]:]=100*notenum[-1]
         #滑音
         #dv滑音机制：
         #0~100，80为0.25s，最大不超过音符长度一半
-        def por(deltax,y1,y2):
-            ls=numpy.linspace(-math.pi/2,math.pi/2,num=deltax,endpoint=False)
-            p=((y1+y2)/2+(y2-y1)/2*numpy.sin(ls))
-            return p
-        
-        for i in range(len(self.note)-1):
-            lastnote=self.note[i]
-            nextnote=self.note[i+1]
-            porstart=lastnote.start+lastnote.length-min((lastnote.length//2,int(0.025*lastnote.portail*tempo)))
-            porend=nextnote.start+min((nextnote.length//2,int(0.025*nextnote.porhead*tempo)))
-            bp[porstart:porend]=por(porend-porstart,lastnote.notenum*100,nextnote.notenum*100).astype(numpy.int)
+        porstart=start[:-1]+length[:-1]-numpy.minimum(length[:-1]//2,(0.025*t.portail[:-1]*tempo[:-1]).astype(numpy.int64))
+        porend=start[1:]+numpy.minimum(length[1:]//2,(0.025*t.porhead[1:]*tempo[1:]).astype(numpy.int64))
+        porlen=porend-porstart
+        index,group,offset=rangeindex(porstart,porlen)
+        paint(bp,index,porcurve(offset,porlen[group],notenum[:-1][group]*100,notenum[1:][group]*100).astype(numpy.int64))
         #弯音
         #dv弯音机制：
         #弯曲段长度受benlen控制，benlen<50时，长度为0.375s。benlen>50时，长度线性变化。benlen=100时，长度为0.6875s
         #前段为直线，从(0,0)到(x,-y)其中x=0.09375s，不超过音符长度一半，
         #y=bendep*0.03
         #后段为正弦曲线
-        def ben(length,benlen,bendep):
-            x1=min((length//2,int(0.09375*tps)))
-            if(benlen<=50):
-                x2=int(0.375*tps)
-            else:
-                x2=int((0.0625+benlen*0.006875)*tps)
-            x2=min((length,x2))
-            b=numpy.zeros(length)
-            b[0:x1]=numpy.linspace(0,-1,num=x1,endpoint=False)
-            b[x1:x2]=por(x2-x1,-1,0)
-            b=b*3*bendep
-            return b
-        for n in self.note:
-            bp[n.start:n.start+n.length]+=ben(n.length,n.benlen,n.bendep).astype(numpy.int)
+        #弯音只影响每个音符的前x2个tick，只计算这一部分
+        x1=numpy.minimum(length//2,(0.09375*tps).astype(numpy.int64))
+        x2=numpy.where(t.benlen<=50,(0.375*tps).astype(numpy.int64),((0.0625+t.benlen*0.006875)*tps).astype(numpy.int64))
+        x2=numpy.where(t.bendep!=0,numpy.minimum(length,x2),0)
+        index,group,offset=rangeindex(start,x2)
+        x1=x1[group]
+        x2=x2[group]
+        b=numpy.zeros(len(index))
+        line=offset<x1
+        b[line]=offset[line]*((-1-0)/x1[line])+0
+        sine=~line
+        b[sine]=porcurve(offset[sine]-x1[sine],x2[sine]-x1[sine],-1,0)
+        b=b*3*t.bendep[group]
+        index=[index]
+        value=[b.astype(numpy.int64)]
         #颤音
-        for n in self.note:
-            vib=numpy.interp(numpy.linspace(0,n.length-1,num=n.length),n.vibp[:,0]/1000.0*tps,n.vibp[:,1],left=0,right=0)
-            bp[n.start:n.start+n.length]+=vib.astype(numpy.int)
+        #只计算颤音曲线不全为0的音符，且只计算颤音曲线覆盖的部分，其余部分为0
+        vibcount=numpy.fromiter(map(len,t.vibp),numpy.int64,len(t))
+        vibp=numpy.concatenate(list(t.vibp)).reshape([-1,2])
+        vibnote=numpy.repeat(numpy.arange(len(t)),vibcount)
+        active=numpy.bincount(vibnote,weights=vibp[:,1]!=0,minlength=len(t))>0
+        if(active.any()):
+            vibp=vibp[active[vibnote]]
+            vibnote=vibnote[active[vibnote]]
+            vibcount=vibcount[active]
+            xp=vibp[:,0]/1000.0*tps[vibnote]
+            last=numpy.cumsum(vibcount)-1
+            lo=numpy.maximum(numpy.ceil(xp[last-vibcount+1]),0).astype(numpy.int64)
+            hi=numpy.minimum(numpy.floor(xp[last]),length[active]-1).astype(numpy.int64)
+            vindex,group,offset=rangeindex(lo,hi-lo+1)
+            vib=groupinterp(vindex,group,xp,vibp[:,1].astype(numpy.float64),vibcount)
+            index.append(start[active][group]+vindex)
+            value.append(vib.astype(numpy.int64))
+        index=numpy.concatenate(index)
+        value=numpy.concatenate(value)
+        keep=(index>=0)&(index<self.length)
+        bp+=numpy.bincount(index[keep],weights=value[keep],minlength=self.length)
         return bp
 
-    def pitch(self,tempolist:List[Tuple[int,float]]):
+    def pitch(self,tempolist:Union[List[Tuple[int,float]],"Dvtempomap"]):
         """
         计算音轨的音高曲线（包括基础音高曲线和编辑过的曲线部分）
+        tempolist:曲速标记列表或Dvtempomap（如Dvfile.tempomap()）
         """
-        #暂不支持变速曲
         p=self.basicpitch(tempolist)#基础音高曲线
-        dp=numpy.interp(numpy.linspace(0,self.length-1,num=self.length),self.pit[:,0],self.pit[:,1],left=0,right=0)#编辑过的曲线部分
+        dp=self.pit.sample(numpy.arange(self.length),left=0,right=0)#编辑过的曲线部分
         sgn=(numpy.sign(dp)+1)//2
         return sgn*dp+(1-sgn)*p
 
@@ -551,32 +1536,27 @@ def music21_stream_to_dv_segment(st)->Dvsegment:
                              hanzi=lyric))
     return Dvsegment(start=7680,length=int(st.duration.quarterLength*480),note=dvnote)
 
-def midi_track_to_dv_segment(mtr,ticks_per_beat:int=480)->Dvsegment:
+def midi_track_to_dv_segment(mtr,ticks_per_beat:int=480,columnar:bool=False)->Dvsegment:
     """
     将mido midi音轨对象转为dv区段
     ticks_per_beat:midi音轨中每拍的tick数，默认480
+    columnar:为True时区段的音符为Dvnotetable，默认为Dvnote列表
+    同一音高的音符重叠时按先开始先结束配对，力度为0的note_on视为note_off
     """
-    tick=0
-    lyric=""
-    note:Dict[int,Tuple[str,int]]={}#{音高:(歌词,开始时间)}
-    dvnote=[]
-    for signal in mtr:
-        tick+=signal.time
-        if(signal.type=="note_on"):
-            #将新音符注册到键位-音符字典中
-            note[signal.note]=(lyric,tick)
-        elif(signal.type=="note_off"):
-            #从键位-音符字典中找到音符，并弹出
-            if(signal.note in note):
-                n=note.pop(signal.note)
-                dvnote.append(Dvnote(start=int(n[1]*480/ticks_per_beat),
-                            length=int((tick-n[1])*480/ticks_per_beat),
-                            notenum=signal.note,
-                            pinyin=n[0],
-                            hanzi=n[0]))
-        elif(signal.type=="lyrics"):
-            lyric=signal.text
-    return Dvsegment(start=7680,length=int(tick*480/ticks_per_beat),note=dvnote,name=mtr.name)
+    from dvfile.midi import readmidotrack
+    return readmidotrack(mtr).tosegment(ticks_per_beat,columnar)
+
+def midi_file_to_dv_file(mid,columnar:bool=False)->"Dvfile":
+    """
+    将mido.MidiFile对象转为dv工程，曲速与拍号写入Dvfile.tempo与Dvfile.beats，没有音符的音轨被忽略
+    columnar:为True时区段的音符为Dvnotetable，默认为Dvnote列表
+    直接读取mid文件请使用openmidi，不需要mido
+    """
+    from dvfile.midi import readmidotrack,todvfile
+    tempo=[]
+    timesig=[]
+    tracks=[readmidotrack(tr,tempo,timesig) for tr in mid.tracks]
+    return todvfile(mid.ticks_per_beat,tracks,tempo,timesig,columnar)
 
 def to_dv_segment(a,track:int=0)->Dvsegment:
     """
@@ -590,8 +1570,8 @@ def to_dv_segment(a,track:int=0)->Dvsegment:
     #从对象类型到所调用函数的字典
     type_function_dict={
         "Dvsegment":copy.deepcopy,#dv区段对象
-        "Dvtrack":lambda x:sum(x.segment),#dv音轨对象
-        "Dvfile":lambda x:sum(x.track[track].segment),#dv工程对象
+        "Dvtrack":lambda x:x.merged(),#dv音轨对象
+        "Dvfile":lambda x:x.track[track].merged(),#dv工程对象
         "MidiTrack":midi_track_to_dv_segment,#mido音轨对象
         "MidiFile":lambda x:midi_track_to_dv_segment(x.tracks[track]),#mido文件对象
         "Stream":music21_stream_to_dv_segment,#Music21普通序列对象
@@ -602,15 +1582,297 @@ def to_dv_segment(a,track:int=0)->Dvsegment:
     #如果在这个字典中没有找到函数，则默认调用a.to_dv_segment()
     return type_function_dict.get(type_name,lambda x:x.to_dv_segment())(a)
 
+class Dvnoteindex():
+    '''
+    音轨的音符区间索引，按绝对时间（区段起点+音符起点）查询音符
+    音符按绝对起点排序，查询时在起点和终点的前缀最大值上二分查找
+    segments:建立索引时的区段列表
+    key:建立索引时各区段的(起点,音符列表)与各音符的起点、长度，用于判断索引是否过期
+    start,end:各音符的绝对起点与终点，numpy.array
+    segment,note:各音符所属区段的编号与在区段中的编号，numpy.array
+    maxend:end的前缀最大值，numpy.array
+    '''
+    def __init__(self,segments:List["Dvsegment"]):
+        self.segments:List[Dvsegment]=list(segments)
+        self.key:list=self.makekey(self.segments)
+        start=[numpy.zeros(0,dtype=numpy.int64)]
+        length=[numpy.zeros(0,dtype=numpy.int64)]
+        segment=[numpy.zeros(0,dtype=numpy.int64)]
+        note=[numpy.zeros(0,dtype=numpy.int64)]
+        for (i,(seg,(segstart,n,s,l))) in enumerate(zip(self.segments,self.key)):
+            start.append(s+segstart)
+            length.append(l)
+            segment.append(numpy.full(len(n),i,dtype=numpy.int64))
+            note.append(numpy.arange(len(n),dtype=numpy.int64))
+        start=numpy.concatenate(start)
+        order=numpy.argsort(start,kind="stable")
+        self.start:numpy.ndarray=start[order]
+        self.end:numpy.ndarray=self.start+numpy.concatenate(length)[order]
+        self.segment:numpy.ndarray=numpy.concatenate(segment)[order]
+        self.note:numpy.ndarray=numpy.concatenate(note)[order]
+        self.maxend:numpy.ndarray=numpy.maximum.accumulate(self.end) if len(self.end) else self.end
+
+    @staticmethod
+    def notetimes(note)->Tuple[numpy.ndarray,numpy.ndarray]:
+        #音符列表中各音符的(起点,长度)，按列存储时复制，不受之后原地修改的影响
+        if(isinstance(note,Dvnotetable)):
+            return (note.start.copy(),note.length.copy())
+        n=len(note)
+        return (numpy.fromiter(map(operator.attrgetter("start"),note),numpy.int64,n),
+                numpy.fromiter(map(operator.attrgetter("length"),note),numpy.int64,n))
+
+    @staticmethod
+    def makekey(segments:List["Dvsegment"])->list:
+        #保留音符列表的引用，防止其id被重复使用
+        return [(seg.start,seg.note)+Dvnoteindex.notetimes(seg.note) for seg in segments]
+
+    def isvalid(self,segments:List["Dvsegment"])->bool:
+        '''
+        区段列表、区段起点、音符列表对象及各音符的起点、长度都没有改变时，索引仍然有效
+        音符列表的排序、替换其中的音符、修改音符的start或length都会使索引失效
+        '''
+        if(len(segments)!=len(self.segments)):
+            return False
+        for (seg,old,(segstart,note,start,length)) in zip(segments,self.segments,self.key):
+            if(seg is not old or seg.start!=segstart or seg.note is not note or len(note)!=len(start)):
+                return False
+            (s,l)=self.notetimes(note)
+            if(not (numpy.array_equal(s,start) and numpy.array_equal(l,length))):
+                return False
+        return True
+
+    def query(self,start:int,end:int)->numpy.ndarray:
+        '''
+        返回与[start,end)有重叠的音符在索引中的位置，按绝对起点排序
+        '''
+        k=numpy.searchsorted(self.start,end,side="left")#起点<end
+        p=numpy.searchsorted(self.maxend,start,side="right")#此前的音符终点都<=start
+        if(p>=k):
+            return numpy.zeros(0,dtype=numpy.int64)
+        return p+numpy.flatnonzero(self.end[p:k]>start)
+
+    def notes(self,positions:numpy.ndarray)->List[Tuple["Dvsegment",Dvnote]]:
+        '''
+        将索引中的位置转为(区段,音符)列表
+        '''
+        return [(self.segments[i],self.segments[i].note[j]) for (i,j) in zip(self.segment[positions].tolist(),self.note[positions].tolist())]
+
+class Dvlyrics():
+    '''
+    工程或音轨中所有音符的歌词，按列存储，一次遍历生成
+    lyrics:歌词表，相同的歌词只存一次，List[str]
+    code:每个音符的歌词在lyrics中的编号，numpy.array
+    track,segment,note:每个音符所在的音轨序号、区段序号与在区段中的序号，numpy.array
+    segments:各区段，按音轨、区段顺序排列，List[Dvsegment]
+    begin:各区段的第一个音符在code中的位置，最后一项为音符总数，numpy.array
+    use_hanzi:是否为汉字歌词，bool
+    生成后修改音符列表，Dvlyrics不再有效
+    '''
+    def __init__(self,tracks:List["Dvtrack"],use_hanzi:bool=False):
+        self.use_hanzi:bool=use_hanzi
+        self.lyrics:List[str]=[]
+        lyricindex={}
+        setdefault=lyricindex.setdefault
+        intern=lambda l:setdefault(l,len(lyricindex))
+        get=operator.attrgetter("hanzi" if use_hanzi else "pinyin")
+        self.segments:List[Dvsegment]=[]
+        code=[numpy.zeros(0,dtype=numpy.int64)]
+        segtrack=[]
+        segnumber=[]
+        count=[]
+        for (i,tr) in enumerate(tracks):
+            for (j,seg) in enumerate(tr.segment):
+                n=seg.note
+                if(isinstance(n,Dvnotetable)):
+                    remap=numpy.fromiter(map(intern,n.lyrics),numpy.int64,len(n.lyrics))
+                    code.append(remap[n.getlyric(use_hanzi)])
+                else:
+                    code.append(numpy.fromiter(map(intern,map(get,n)),numpy.int64,len(n)))
+                self.segments.append(seg)
+                segtrack.append(i)
+                segnumber.append(j)
+                count.append(len(n))
+        self.lyrics=list(lyricindex)
+        self.code:numpy.ndarray=numpy.concatenate(code)
+        count=numpy.array(count,dtype=numpy.int64)
+        self.begin:numpy.ndarray=numpy.concatenate([[0],numpy.cumsum(count)]).astype(numpy.int64)
+        self.track:numpy.ndarray=numpy.repeat(numpy.array(segtrack,dtype=numpy.int64),count)
+        self.segment:numpy.ndarray=numpy.repeat(numpy.array(segnumber,dtype=numpy.int64),count)
+        self.note:numpy.ndarray=numpy.arange(len(self.code),dtype=numpy.int64)-numpy.repeat(self.begin[:-1],count)
+
+    def __len__(self):
+        return len(self.code)
+
+    def tolist(self)->List[str]:
+        '''
+        返回所有音符的歌词列表
+        '''
+        return [self.lyrics[i] for i in self.code.tolist()]
+
+    def count(self)->Dict[str,int]:
+        '''
+        返回每种歌词的音符数，{歌词:音符数}，不含没有音符的歌词
+        '''
+        count=numpy.bincount(self.code,minlength=len(self.lyrics))
+        return {self.lyrics[i]:int(count[i]) for i in numpy.flatnonzero(count).tolist()}
+
+    def mask(self,f,vectorized:bool=False)->numpy.ndarray:
+        '''
+        对每个音符的歌词求f，返回bool数组，每种歌词只计算一次
+        f:集合/列表/元组/字符串（判断歌词是否属于f），或函数
+        vectorized:为True时，f只调用一次，输入为歌词表（str类型的numpy.array），输出为每种歌词的bool数组
+        '''
+        if(vectorized):
+            inset=numpy.asarray(f(numpy.array(self.lyrics,dtype=str)),dtype=bool).reshape(-1)
+        elif(callable(f)):
+            inset=numpy.array([bool(f(l)) for l in self.lyrics],dtype=bool)
+        else:
+            inset=numpy.array([l in f for l in self.lyrics],dtype=bool)
+        return inset[self.code] if len(inset) else numpy.zeros(len(self.code),dtype=bool)
+
+    def where(self,f,vectorized:bool=False)->List[Tuple[int,int,int]]:
+        '''
+        返回歌词满足f的音符，[(音轨序号,区段序号,音符序号)]，f见mask
+        '''
+        k=numpy.flatnonzero(self.mask(f,vectorized))
+        return list(zip(self.track[k].tolist(),self.segment[k].tolist(),self.note[k].tolist()))
+
+    def segmentof(self)->numpy.ndarray:
+        '''
+        返回每个音符所在的区段在segments中的位置
+        '''
+        return numpy.repeat(numpy.arange(len(self.segments),dtype=numpy.int64),numpy.diff(self.begin))
+
+    def replace(self,mapping)->int:
+        '''
+        按mapping替换歌词并写回音符，每种歌词只计算一次，只写入歌词改变的音符
+        mapping:{原歌词:新歌词}，不在字典中的歌词不变；或输入、输出均为str的函数
+        返回：改变的音符数
+        '''
+        if(callable(mapping)):
+            new=[mapping(l) for l in self.lyrics]
+        else:
+            new=[mapping.get(l,l) for l in self.lyrics]
+        changed=numpy.array([a!=b for (a,b) in zip(self.lyrics,new)],dtype=bool)
+        if(not changed.any()):
+            return 0
+        name="hanzi" if self.use_hanzi else "pinyin"
+        k=numpy.flatnonzero(changed[self.code])
+        for (s,i,c) in zip(self.segmentof()[k].tolist(),self.note[k].tolist(),self.code[k].tolist()):
+            setattr(self.segments[s].note[i],name,new[c])
+        #更新歌词表，替换后相同的歌词合并为一项
+        newindex={}
+        remap=numpy.array([newindex.setdefault(l,len(newindex)) for l in new],dtype=numpy.int64)
+        self.lyrics=list(newindex)
+        self.code=remap[self.code]
+        return len(k)
+
+    def keep(self,mask:numpy.ndarray)->int:
+        '''
+        只保留mask为True的音符，其余音符从区段中删除，只修改有音符被删除的区段
+        返回：删除的音符数
+        '''
+        mask=numpy.asarray(mask,dtype=bool)
+        removed=numpy.bincount(self.segmentof()[~mask],minlength=len(self.segments))
+        for s in numpy.flatnonzero(removed).tolist():
+            seg=self.segments[s]
+            m=mask[self.begin[s]:self.begin[s+1]]
+            if(isinstance(seg.note,Dvnotetable)):
+                seg.note=seg.note[m]
+            else:
+                seg.note=[n for (n,k) in zip(seg.note,m.tolist()) if k]
+        return int(len(mask)-mask.sum())
+
+def ishanzi(s:str)->bool:
+    #是否为单个汉字（基本区与扩展A区）
+    return len(s)==1 and ("\u4e00"<=s<="\u9fff" or "\u3400"<=s<="\u4dbf")
+
+@functools.lru_cache(maxsize=65536)
+def hanzitopinyin(hanzi:str,prev:str="",next:str="")->Tuple[str,...]:
+    """
+    将单个汉字转为拼音（不带声调，ü写作v），返回所有读音，按上下文判断的读音在最前
+    prev,next:前后相邻的汉字，用于判断多音字，不是汉字时为""
+    结果按(汉字,上下文)缓存，最多65536项，清空缓存：hanzitopinyin.cache_clear()
+    需要pypinyin
+    """
+    import pypinyin
+    text=prev+hanzi+next
+    first=pypinyin.lazy_pinyin(text)[len(prev)]
+    readings=pypinyin.pinyin(hanzi,style=pypinyin.Style.NORMAL,heteronym=True)[0]
+    return tuple(dict.fromkeys([first]+readings))
+
+def fillpinyin(tracks:List["Dvtrack"],singers=None,overwrite:bool=False)->int:
+    """
+    按汉字歌词批量填写拼音，一次遍历所有音轨，每组(前一字,汉字,后一字,音源)只转换一次
+    tracks:音轨列表
+    singers:音源索引，SingerRegistry或{音源名:Dvbank}，为None时不查音源
+        多音字优先使用区段音源的发音列表中有的读音，找不到音源时使用按上下文判断的读音
+    overwrite:为False时只填写拼音为空、与汉字相同或含非ASCII字符的音符，为True时所有汉字音符都重新填写
+    返回：改变的音符数
+    """
+    hz=Dvlyrics(tracks,use_hanzi=True)
+    py=Dvlyrics(tracks,use_hanzi=False)
+    n=len(hz)
+    if(n==0):
+        return 0
+    #每种歌词是否为汉字，每种拼音是否需要填写
+    cjk=numpy.array([ishanzi(l) for l in hz.lyrics],dtype=bool)
+    missing=numpy.array([(l=="" or any(ord(c)>127 for c in l)) for l in py.lyrics],dtype=bool)
+    need=cjk[hz.code]
+    if(not overwrite):
+        need&=missing[py.code]|(numpy.array(hz.lyrics,dtype=object)[hz.code]==numpy.array(py.lyrics,dtype=object)[py.code])
+    k=numpy.flatnonzero(need)
+    if(len(k)==0):
+        return 0
+    #相邻音符的汉字编号，区段边界处与非汉字为-1
+    code=numpy.where(cjk[hz.code],hz.code,-1)
+    prevcode=numpy.concatenate([[-1],code[:-1]])
+    nextcode=numpy.concatenate([code[1:],[-1]])
+    prevcode[hz.begin[:-1][hz.begin[:-1]<n]]=-1
+    ends=hz.begin[1:]-1
+    nextcode[ends[ends>=0]]=-1
+    #区段音源编号
+    segof=hz.segmentof()
+    singernames=list(dict.fromkeys(seg.singer for seg in hz.segments))
+    singerindex={name:i for (i,name) in enumerate(singernames)}
+    singer=numpy.array([singerindex[seg.singer] for seg in hz.segments],dtype=numpy.int64)[segof]
+    prons=[]
+    for name in singernames:
+        bank=None if singers is None else singers.get(name)
+        prons.append(None if bank is None else bank.pron())
+    #每组(前一字,汉字,后一字,音源)只转换一次
+    keys=numpy.column_stack([prevcode[k],hz.code[k],nextcode[k],singer[k]])
+    (unique,inverse)=numpy.unique(keys,axis=0,return_inverse=True)
+    lyrics=hz.lyrics+[""]#编号-1对应""
+    result=[]
+    for (a,c,b,si) in unique.tolist():
+        readings=hanzitopinyin(lyrics[c],lyrics[a],lyrics[b])
+        pron=prons[si]
+        if(pron is not None):
+            readings=[r for r in readings if r in pron] or readings
+        result.append(readings[0])
+    #只写入拼音改变的音符
+    count=0
+    old=py.lyrics
+    for (s,i,r,p) in zip(segof[k].tolist(),hz.note[k].tolist(),inverse.reshape(-1).tolist(),py.code[k].tolist()):
+        if(old[p]!=result[r]):
+            hz.segments[s].note[i].pinyin=result[r]
+            count+=1
+    return count
+
 class Dvtrack():
     '''
     dv音轨类
     name:音轨名，str
     segment:区段列表
+    segmentblock:区段列表在源数据中的位置，Skblock，仅在延迟解码时使用，segment第一次被访问时才解码
     volume:音量，int,[0,100]
     balance:左右声道平衡，int,[-50,50]
     mute:静音，bool
     solo:独奏，bool
+    noteindexcache:音符区间索引，Dvnoteindex，见noteindex
+    sourceblock:音轨在源数据中的位置，Skblock，从文件读取的音轨才有，见ischanged
+    sourcesegment:解码时的区段列表
     '''
     def __init__(self,name:str="",
                  segment:List[Dvsegment]=[],
@@ -625,7 +1887,23 @@ class Dvtrack():
         self.balance:int=balance
         self.mute:bool=mute
         self.solo:bool=solo
+        self.segmentblock:Skblock=None
+        self.sourceblock:Skblock=None
+        self.sourcesegment:List[Dvsegment]=None
         self.segment:List[Dvsegment]=segment
+        self.noteindexcache:Dvnoteindex=None
+
+    @property
+    def segment(self)->List[Dvsegment]:
+        if(self._segment is None):
+            r=self.segmentblock.reader()
+            self._segment=[readdvsegment(r,lazy=True) for i in range(r.readint())]
+            self.sourcesegment=self._segment
+        return self._segment
+
+    @segment.setter
+    def segment(self,segment:List[Dvsegment]):
+        self._segment=segment
         
     def __str__(self):
         s=" track {}\n".format(self.name)
@@ -634,16 +1912,46 @@ class Dvtrack():
         return s
     
     def __bytes__(self):
+        w=Skwriter()
+        self.writeto(w)
+        return w.getvalue()
+
+    def ischanged(self)->bool:
+        '''
+        音轨在读取后是否被修改，没有源数据（不是从文件读取）的音轨总是返回True
+        比较音轨属性与源数据，区段列表是否为解码时的列表，以及各区段是否被修改（见Dvsegment.ischanged）
+        '''
+        if(self.sourceblock is None):
+            return True
+        from dvfile.data import balanceread
+        r=self.sourceblock.reader()
+        r.skip(4)#tracktype
+        header=(r.readstr(),r.readbool(),r.readbool(),r.readint(),balanceread.get(bytes(r.buf[r.pos:r.pos+4]),0))
+        if((self.name,self.mute,self.solo,self.volume,self.balance)!=header):
+            return True
+        segment=self._segment
+        if(segment is None):
+            return False
+        r.skip(8)#左右声道平衡，区段占用空间
+        if(segment is not self.sourcesegment or len(segment)!=r.readint()):
+            return True
+        return any(seg.ischanged() for seg in segment)
+
+    def writeto(self,w:Skwriter):
+        '''
+        将音轨写入Skwriter，未修改的音轨直接复制源数据，修改过的音轨中未修改的区段也直接复制源数据
+        '''
         from dvfile.data import balancewrite
-        b=(b"\x00\x00\x00\x00"#tracktype
-           +skwritestr(self.name)
-           +bytes([int(self.mute)])
-           +bytes([int(self.solo)])
-           +skwriteint(self.volume)
-           +balancewrite.get(self.balance,b"\0\0\0\0")
-           +skwritelist(self.segment)
-           )
-        return b
+        if(w.simplify is None and not self.ischanged()):
+            w.writeshared(self.sourceblock.getvalue())
+            return
+        w.writeint(0)#tracktype
+        w.writestr(self.name)
+        w.writebool(self.mute)
+        w.writebool(self.solo)
+        w.writeint(self.volume)
+        w.write(balancewrite.get(self.balance,b"\0\0\0\0"))
+        w.writelist(self.segment)
     
     def quantize(self,d:int):
         '''
@@ -655,7 +1963,7 @@ class Dvtrack():
         for seg in self.segment:
             segstart=intquantize(seg.start,d)
             segend=intquantize(seg.start+seg.length,d)
-            seg=Dvsegment(segstart,0,seg.name,seg.singer,[])+seg
+            seg=Dvsegment.concat([Dvsegment(segstart,0,seg.name,seg.singer,[]),seg])
             seg.length=segend-segstart
             seg.quantize(d)
             new_seg+=[seg]
@@ -683,6 +1991,14 @@ class Dvtrack():
             seg.cutparam(head,tail)
         return self
 
+    def simplify(self,cents:float=2,value:float=0,report:Dict[str,List[int]]=None):
+        """
+        化简音轨中所有区段的参数曲线与颤音曲线，见Dvsegment.simplify
+        """
+        for seg in self.segment:
+            seg.simplify(cents,value,report)
+        return self
+
     def fixnoteoverlap(self):
         """
         修复音符重叠
@@ -723,6 +2039,37 @@ class Dvtrack():
             seg.filterout(s,use_hanzi)
         return self
 
+    def lyricarray(self,use_hanzi:bool=False)->Dvlyrics:
+        '''
+        返回音轨中所有音符的歌词，见Dvlyrics
+        默认使用拼音，如需使用汉字，use_hanzi=True
+        '''
+        return Dvlyrics([self],use_hanzi)
+
+    def maplyric(self,mapping,use_hanzi:bool=False):
+        '''
+        批量替换音轨中的歌词，每种歌词只计算一次，见Dvlyrics.replace
+        mapping:{原歌词:新歌词}或函数，例如tr.maplyric({"de":"di"})
+        '''
+        self.lyricarray(use_hanzi).replace(mapping)
+        return self
+
+    def filterlyric(self,f,vectorized:bool=False,use_hanzi:bool=False):
+        '''
+        按歌词过滤音轨中的音符，保留歌词满足f的音符，每种歌词只计算一次，f见Dvlyrics.mask
+        例如删除所有连音符：tr.filterlyric(lambda l:l!="-")
+        '''
+        lyr=self.lyricarray(use_hanzi)
+        lyr.keep(lyr.mask(f,vectorized))
+        return self
+
+    def fill_pinyin(self,singers=None,overwrite:bool=False):
+        """
+        按汉字歌词批量填写音轨中的拼音，需要pypinyin，见fillpinyin
+        """
+        fillpinyin([self],singers,overwrite)
+        return self
+
     def setsinger(self,singer:str):
         """
         为音轨中的所有区段统一设置音源名
@@ -731,6 +2078,14 @@ class Dvtrack():
             seg.singer=singer
         return self
 
+    def columnar(self,on:bool=True):
+        '''
+        切换音轨中所有区段的音符存储方式，见Dvsegment.columnar
+        '''
+        for seg in self.segment:
+            seg.columnar(on)
+        return self
+
     def transpose(self,n:int):
         """
         对dv音轨移调
@@ -740,18 +2095,53 @@ class Dvtrack():
             seg.transpose(n)
         return self
 
+    def merged(self,start:int=None)->Dvsegment:
+        '''
+        将音轨中的所有区段合并为一个区段，见Dvsegment.concat
+        start:合并后区段的起点，默认为第一个区段的起点
+        '''
+        if(start is None):
+            if(len(self.segment)==0):
+                return Dvsegment(0,0)
+            return Dvsegment.concat(self.segment)
+        return Dvsegment.concat([Dvsegment(start,0)]+self.segment)
+
+    def noteindex(self)->Dvnoteindex:
+        '''
+        返回音符区间索引，第一次查询时建立
+        区段列表、区段起点、音符列表或各音符的起点、长度改变时自动重建
+        每次查询都会按列比较各音符的起点与长度，比重建索引（需要排序）快
+        '''
+        if(self.noteindexcache is None or not self.noteindexcache.isvalid(self.segment)):
+            self.noteindexcache=Dvnoteindex(self.segment)
+        return self.noteindexcache
+
+    def notes_in_range(self,start:int,end:int)->List[Tuple[Dvsegment,Dvnote]]:
+        '''
+        返回在[start,end)内发声的音符，start,end为绝对时间（从-3小节算起的tick）
+        返回：[(区段,音符)]，按音符绝对起点排序
+        '''
+        index=self.noteindex()
+        return index.notes(index.query(start,end))
+
+    def notes_at(self,tick:int)->List[Tuple[Dvsegment,Dvnote]]:
+        '''
+        返回在绝对时间tick处发声的音符，[(区段,音符)]
+        '''
+        return self.notes_in_range(tick,tick+1)
+
     def to_ust_file(self,use_hanzi:bool=False):
         '''
         将dv音轨对象转换为ust文件对象
         默认使用dv文件中的拼音，如果需要使用汉字，use_hanzi=True
         '''
-        return sum(self.segment,Dvsegment(0,0)).to_ust_file(use_hanzi)
+        return self.merged(0).to_ust_file(use_hanzi)
     
     def to_nn_file(self):
         '''
         将dv音轨对象转换为nn文件对象
         '''
-        return sum(self.segment,Dvsegment(0,0)).to_nn_file()
+        return self.merged(0).to_nn_file()
         pass
 
     def to_midi_track(self,use_hanzi:bool=False):
@@ -759,7 +2149,7 @@ class Dvtrack():
         将dv音轨对象转换为mido.MidiTrack文件对象
         默认使用dv文件中的拼音，如果需要使用汉字，use_hanzi=True
         '''
-        s=sum(self.segment,Dvsegment(0,0))
+        s=self.merged(0)
         return s.to_midi_track(use_hanzi)
 
     def to_music21_stream(self,use_hanzi:bool=False):
@@ -771,7 +2161,7 @@ class Dvtrack():
     
     def to_iftp_track(self,use_hanzi:bool=False,beat:int=4):
         #iftpy暂停开发，请勿使用
-        seg=sum(self.segment,Dvsegment(0,0))
+        seg=self.merged(0)
         seg.name=self.name
         return seg.to_iftp_track(use_hanzi=use_hanzi,beat=beat)
 
@@ -790,7 +2180,7 @@ def to_dv_track(a,track:int=0)->Dvtrack:
         "Dvtrack":copy.deepcopy,#dv音轨对象
         "Dvfile":lambda x:copy.deepcopy(x.track[track]),#dv工程对象
         "MidiTrack":lambda x:Dvtrack(name=x.name,segment=[to_dv_segment(x)]),#mido音轨对象
-        "MidiFile":lambda x:Dvtrack(segment=[midi_track_to_dv_segment(x.tracks[track],ticks_per_beat=x.ticks_per_beats)],name=x.tracks[track].name),#mido文件对象
+        "MidiFile":lambda x:Dvtrack(segment=[midi_track_to_dv_segment(x.tracks[track],ticks_per_beat=x.ticks_per_beat)],name=x.tracks[track].name),#mido文件对象
         "Stream":lambda x:Dvtrack(segment=[to_dv_segment(x)]),
         "Measure":lambda x:Dvtrack(segment=[to_dv_segment(x)]),
         "Part":lambda x:Dvtrack(segment=[to_dv_segment(x)]),
@@ -829,21 +2219,106 @@ class Dvinst():
         self.solo:bool=solo
 
     def __bytes__(self):
-        b=(b"\x01\x00\x00\x00"#tracktype
-        +skwritestr(self.name)
-        +skwritebool(self.mute)
-        +skwritebool(self.solo)
-        +skwriteint(self.volume)
-        +b"\x00\x00\x00\x00"#左右声道平衡
-        +skwritebytes(
-            b"\x01\x00\x00\x00"
-            +skwriteint(self.start)
-            +skwriteint(self.length)
-            +skwritestr(self.name)
-            +skwritestr(self.filename)
-            )
-        )
-        return b
+        w=Skwriter()
+        self.writeto(w)
+        return w.getvalue()
+
+    def writeto(self,w:Skwriter):
+        '''
+        将伴奏音轨写入Skwriter
+        '''
+        w.writeint(1)#tracktype
+        w.writestr(self.name)
+        w.writebool(self.mute)
+        w.writebool(self.solo)
+        w.writeint(self.volume)
+        w.writeint(0)#左右声道平衡
+        pos=w.begin()
+        w.writeints(1,self.start,self.length)
+        w.writestr(self.name)
+        w.writestr(self.filename)
+        w.end(pos)
+
+class Dvtempomap():
+    '''
+    预先计算的曲速表，用于tick与秒之间的批量换算
+    tempo:曲速标记列表，[(位置,曲速)]
+    tick:各曲速标记的位置，numpy.array
+    bpm:各曲速标记的曲速，numpy.array
+    time:各曲速标记处的时间（秒），以第一个曲速标记为0，numpy.array
+    第一个曲速标记之前按第一个曲速计算
+    '''
+    def __init__(self,tempo:List[Tuple[int,float]]):
+        self.tempo:List[Tuple[int,float]]=list(tempo)
+        tempo=sorted(tempo)
+        self.tick=numpy.array([i[0] for i in tempo],dtype=numpy.int64)
+        self.bpm=numpy.array([i[1] for i in tempo],dtype=numpy.float64)
+        self.time=numpy.append(0.0,numpy.cumsum(numpy.diff(self.tick)/(8*self.bpm[:-1])))
+
+    def index(self,tick)->numpy.ndarray:
+        '''
+        各tick所在的曲速段编号
+        '''
+        return numpy.maximum(numpy.searchsorted(self.tick,tick,side="right")-1,0)
+
+    def bpmat(self,tick)->numpy.ndarray:
+        '''
+        各tick处的曲速
+        '''
+        return self.bpm[self.index(tick)]
+
+    def tick2time(self,tick):
+        '''
+        tick转为秒，tick可以为数组
+        '''
+        tick=numpy.asarray(tick)
+        i=self.index(tick)
+        return self.time[i]+(tick-self.tick[i])/(8*self.bpm[i])
+
+    def time2tick(self,time):
+        '''
+        秒转为tick（取整），time可以为数组
+        '''
+        time=numpy.asarray(time)
+        i=numpy.maximum(numpy.searchsorted(self.time,time,side="left")-1,0)
+        return self.tick[i]+((time-self.time[i])*8*self.bpm[i]).astype(numpy.int64)
+
+class Dvbeatmap():
+    '''
+    预先计算的节拍表，用于（小节，拍子，拍内位置）与tick之间的批量换算
+    beats:节拍标记列表，[(小节数位置,每小节拍数,x分音符为1拍)]
+    bar,num,den:各节拍标记的小节数位置、每小节拍数、x分音符为1拍，numpy.array
+    tick:各节拍标记处的时间，以第一个节拍标记为0，numpy.array
+    '''
+    def __init__(self,beats:List[Tuple[int,int,int]]):
+        self.beats:List[Tuple[int,int,int]]=list(beats)
+        beats=sorted(beats)
+        self.bar=numpy.array([i[0] for i in beats],dtype=numpy.int64)
+        self.num=numpy.array([i[1] for i in beats],dtype=numpy.int64)
+        self.den=numpy.array([i[2] for i in beats],dtype=numpy.int64)
+        self.tick=numpy.append(0,numpy.cumsum(numpy.diff(self.bar)*self.num[:-1]*1920//self.den[:-1]))
+
+    def pos2tick(self,bar,beat=1,tick=0)->numpy.ndarray:
+        '''
+        （小节，拍子，拍内位置）转为tick，参数可以为数组
+        '''
+        bar=numpy.asarray(bar)
+        i=numpy.maximum(numpy.searchsorted(self.bar,bar,side="right")-1,0)
+        den=self.den[i]
+        return self.tick[i]+(bar-self.bar[i])*self.num[i]*1920//den+(numpy.asarray(beat)-1)*1920//den+tick
+
+    def tick2pos(self,tick)->numpy.ndarray:
+        '''
+        tick转为（小节，拍子，拍内位置），tick可以为数组，返回形状为(...,3)的数组
+        '''
+        tick=numpy.asarray(tick)
+        i=numpy.clip(numpy.searchsorted(self.tick,tick,side="left")-1,0,len(self.tick)-1)
+        t=tick-self.tick[i]
+        barlen=self.num[i]*1920/self.den[i]
+        beatlen=1920//self.den[i]
+        bar=self.bar[i]+(t//barlen).astype(numpy.int64)
+        beat=(t%barlen).astype(numpy.int64)//beatlen+1
+        return numpy.stack((bar,beat,t%beatlen),axis=-1)
 
 class Dvfile():
     '''
@@ -854,6 +2329,7 @@ class Dvfile():
         节拍标记：(小节数位置,每小节拍数,x分音符为1拍(只能为1,2,4,8,16,32))
     track:音轨列表
     inst:伴奏音轨列表
+    mmapfile:用内存映射打开时的文件名，工程的源数据引用该文件的映射，见save
     '''
     def __init__(self,
                  tempo:Union[List[Tuple[int,float]],float,int]=[(0,120.0)],
@@ -870,6 +2346,9 @@ class Dvfile():
         self.beats:List[Tuple[int,int,int]]=beats
         self.track:List[Dvtrack]=track
         self.inst:List[Dvinst]=inst
+        self.tempocache:Dvtempomap=None
+        self.beatscache:Dvbeatmap=None
+        self.mmapfile:str=None
         
     def __str__(self):
         s="{}\n{}\n".format(self.tempo,self.beats)
@@ -878,95 +2357,148 @@ class Dvfile():
         return s
     
     def __bytes__(self):
-        btempo=[skwriteint(i[0])+skwriteint(int(i[1]*100)) for i in self.tempo]
-        bbeats=[numpy.array(i) for i in self.beats]
-        b=(b'ext1ext2ext3ext4ext5ext6ext7'
-           +skwritelist(btempo)
-           +skwritelist(bbeats)
-           +skwritelist([]+self.track+self.inst)[4:]
-           )
-        b=b'SHARPKEY\x05\x00\x00\x00'+skwritebytes(b) 
-        return b
+        w=Skwriter()
+        self.writeto(w)
+        return w.getvalue()
+
+    def writeto(self,w:Skwriter):
+        '''
+        将工程写入Skwriter
+        '''
+        w.write(b'SHARPKEY\x05\x00\x00\x00')
+        pos=w.begin()
+        w.write(b'ext1ext2ext3ext4ext5ext6ext7')
+        #曲速标记
+        tempopos=w.begin()
+        w.writeint(len(self.tempo))
+        for i in self.tempo:
+            w.writeints(i[0],int(i[1]*100))
+        w.end(tempopos)
+        #节拍标记
+        beatspos=w.begin()
+        w.writeint(len(self.beats))
+        for i in self.beats:
+            w.writeints(*i)
+        w.end(beatspos)
+        #音轨，没有长度前缀
+        w.writeint(len(self.track)+len(self.inst))
+        for i in self.track+self.inst:
+            i.writeto(w)
+        w.end(pos)
     
-    def save(self,filename:str):
+    def save(self,filename:str,stream:bool=False,simplify_cents:float=None,simplify_value:float=0)->Dict[str,List[int]]:
         '''
         保存dv文件
         filename:文件名
-        '''
+        stream:是否边编码边写入文件，默认为False。为True时内存中只保留一小段缓冲区，长度前缀写完数据后回填
+        simplify_cents:不为None时，写入前化简参数曲线与颤音曲线，pit与vibp的容差为simplify_cents音分，工程本身不被修改
+        simplify_value:vol、bre、gen、vibamp、vibfre的容差，默认为0，即只删除共线的点
+        返回：化简统计，{曲线名:[原点数,删除点数]}，不化简时为空字典
+        工程用内存映射从filename打开时（见mmapfile），先写入同目录下的临时文件再替换filename，其余情况直接写入filename
+        '''
+        simplify=None if simplify_cents is None else curvetolerance(simplify_cents,simplify_value)
+        if(self.mmapfile is not None and os.path.exists(filename) and os.path.samefile(self.mmapfile,filename)):
+            #直接覆盖会截断源数据所在的映射文件；filename为符号链接时替换链接指向的文件
+            filename=os.path.realpath(filename)
+            tmp="{}.{}.tmp".format(filename,os.getpid())
+            try:
+                with open(tmp,mode="wb") as file:
+                    report=self.writefile(file,stream,simplify)
+                os.replace(tmp,filename)
+            except BaseException:
+                if(os.path.exists(tmp)):
+                    os.remove(tmp)
+                raise
+            return report
         with open(filename,mode="wb") as file:
-            file.write(bytes(self))
+            return self.writefile(file,stream,simplify)
+
+    def writefile(self,file,stream:bool=False,simplify:Dict[str,float]=None)->Dict[str,List[int]]:
+        '''
+        将工程写入已打开的二进制文件file，参数见save
+        '''
+        if(stream):
+            w=Skwriter(file,simplify=simplify)
+            self.writeto(w)
+            w.flush()
+        else:
+            w=Skwriter(simplify=simplify)
+            self.writeto(w)
+            w.dump(file)
+        return w.report
         
-    def pos2tick(self,bar:int,beat:int=1,tick:int=0)->int:
+    def notes_in_range(self,start:int,end:int)->List[Tuple[Dvtrack,Dvsegment,Dvnote]]:
+        '''
+        返回所有音轨中在[start,end)内发声的音符，start,end为绝对时间（从-3小节算起的tick）
+        返回：[(音轨,区段,音符)]，见Dvtrack.notes_in_range
+        '''
+        return [(tr,seg,note) for tr in self.track for (seg,note) in tr.notes_in_range(start,end)]
+
+    def notes_at(self,tick:int)->List[Tuple[Dvtrack,Dvsegment,Dvnote]]:
+        '''
+        返回所有音轨中在绝对时间tick处发声的音符，[(音轨,区段,音符)]
+        '''
+        return self.notes_in_range(tick,tick+1)
+
+    def beatmap(self)->"Dvbeatmap":
+        '''
+        返回根据beats预先计算的节拍表，beats没有改变时重复调用返回同一个对象
+        '''
+        if(self.beatscache is None or self.beatscache.beats!=self.beats):
+            self.beatscache=Dvbeatmap(self.beats)
+        return self.beatscache
+
+    def pos2tick(self,bar,beat=1,tick=0):
         '''
         根据beats进行时间换算：
-        输入：（小节，拍子，拍内位置）（dv gui上的SONG POS）
+        输入：（小节，拍子，拍内位置）（dv gui上的SONG POS），可以为数组
         输出：从-3小节开始，四分音符为480的时间
         '''
-        beats=self.beats
-        for i in range(0,len(beats)):
-            if(beats[i][0]>bar):
-                beats=beats[0:i]
-                break
-        beats+=[(bar,beats[-1][1],beats[-1][2])]
-        t=0
-        for i in range(0,len(beats)-1):
-            t+=(beats[i+1][0]-beats[i][0])*beats[i][1]*1920//beats[i][2]
-        t+=(beat-1)*1920//beats[i][2]+tick
+        t=self.beatmap().pos2tick(bar,beat,tick)
+        if(t.ndim==0):
+            return int(t)
         return t
     
-    def tick2pos(self,tick:int)->Tuple[int,int,int]:
+    def tick2pos(self,tick):
         '''
         根据beats进行时间换算：
-        输入：从-3小节开始，四分音符为480的时间
-        输出：元组（小节，拍子，拍内位置）（dv gui上的SONG POS）
-        '''
-        beats=self.beats
-        t=0
-        for i in range(0,len(beats)-1):
-            tc=t+(beats[i+1][0]-beats[i][0])*beats[i][1]*1920//beats[i][2]
-            if(tc<tick):
-                t=tc
-            else:
-                beats=beats[0:i+1]
-                break
-        bar=beats[-1][0]+int((tick-t)//(beats[-1][1]*1920/beats[i][2]))
-        beat=int((tick-t)%(beats[-1][1]*1920/beats[i][2]))//(1920//beats[i][2])+1
-        tick=(tick-t)%(1920//beats[i][2])
-        return (bar,beat,tick)
+        输入：从-3小节开始，四分音符为480的时间，可以为数组
+        输出：元组（小节，拍子，拍内位置）（dv gui上的SONG POS）；
+            输入为数组时，输出为形状为(...,3)的数组，最后一维为（小节，拍子，拍内位置）
+        '''
+        pos=self.beatmap().tick2pos(tick)
+        if(pos.ndim==1):
+            return tuple(int(i) for i in pos)
+        return pos
     
-    def tick2time(self,tick:int)->float:
+    def tempomap(self)->Dvtempomap:
+        '''
+        返回根据tempo预先计算的曲速表，tempo没有改变时重复调用返回同一个对象
+        '''
+        if(self.tempocache is None or self.tempocache.tempo!=self.tempo):
+            self.tempocache=Dvtempomap(self.tempo)
+        return self.tempocache
+
+    def tick2time(self,tick):
         '''
         根据tempo进行时间换算：
-        输入：从-3小节开始，四分音符为480的时间
+        输入：从-3小节开始，四分音符为480的时间，可以为数组
         输出：从-3小节开始，以秒为单位的时间
         '''
-        tempos=self.tempo
-        for i in range(0,len(tempos)):
-            if(tempos[i][0]>tick):
-                tempos=tempos[0:i]
-                break
-        tempos+=[(tick,tempos[-1][1])]
-        t=0.0
-        for i in range(0,len(tempos)-1):
-            t+=(tempos[i+1][0]-tempos[i][0])/(8*tempos[i][1])
+        t=self.tempomap().tick2time(tick)
+        if(t.ndim==0):
+            return float(t)
         return t
     
-    def time2tick(self,time:float)->int:
+    def time2tick(self,time):
         '''
         根据tempo进行时间换算：
-        输入：从-3小节开始，以秒为单位的时间
+        输入：从-3小节开始，以秒为单位的时间，可以为数组
         输出：从-3小节开始，四分音符为480的时间
         '''
-        tempos=self.tempo
-        t=0
-        for i in range(0,len(tempos)-1):
-            tc=t+(tempos[i+1][0]-tempos[i][0])/(8*tempos[i][1])
-            if(tc<time):
-                t=tc
-            else:
-                tempos=tempos[0:i+1]
-                break
-        tick=tempos[-1][0]+int((time-t)*8*tempos[-1][1])
+        tick=self.tempomap().time2tick(time)
+        if(tick.ndim==0):
+            return int(tick)
         return tick
     
     def quantize(self,d:int):
@@ -1000,6 +2532,15 @@ class Dvfile():
             seg.cutparam(head=head,tail=tail)
         return self
 
+    def simplify(self,cents:float=2,value:float=0,report:Dict[str,List[int]]=None):
+        """
+        化简工程中所有区段的参数曲线与颤音曲线，见Dvsegment.simplify
+        只在保存时化简而不修改工程，请使用save(filename,simplify_cents=cents)
+        """
+        for tr in self.track:
+            tr.simplify(cents,value,report)
+        return self
+
     def fixnoteoverlap(self):
         """
         修复音符重叠
@@ -1021,6 +2562,15 @@ class Dvfile():
             tr.fix()
         return self
 
+    def lint(self,singers=None)->list:
+        '''
+        检查工程中的问题（音符重叠、未排序、超出区段，参数超出范围，未知音源，左右声道平衡无法保存），不修改工程
+        singers:已知音源，SingerRegistry或音源名集合，为None时不检查音源
+        返回：问题列表，List[Dvissue]，见dvfile.lint
+        '''
+        from dvfile.lint import lint
+        return lint(self,singers)
+
     def filter(self,func):
         '''
         按函数过滤工程中的音符
@@ -1041,6 +2591,40 @@ class Dvfile():
             tr.filterout(s,use_hanzi)
         return self
 
+    def lyricarray(self,use_hanzi:bool=False)->Dvlyrics:
+        '''
+        返回工程中所有音符的歌词，见Dvlyrics
+        默认使用拼音，如需使用汉字，use_hanzi=True
+        '''
+        return Dvlyrics(self.track,use_hanzi)
+
+    def maplyric(self,mapping,use_hanzi:bool=False):
+        '''
+        批量替换工程中的歌词，每种歌词只计算一次，见Dvlyrics.replace
+        mapping:{原歌词:新歌词}或函数，例如d.maplyric({"de":"di"})
+        '''
+        self.lyricarray(use_hanzi).replace(mapping)
+        return self
+
+    def filterlyric(self,f,vectorized:bool=False,use_hanzi:bool=False):
+        '''
+        按歌词过滤工程中的音符，保留歌词满足f的音符，每种歌词只计算一次，f见Dvlyrics.mask
+        例如删除所有连音符：d.filterlyric(lambda l:l!="-")
+        '''
+        lyr=self.lyricarray(use_hanzi)
+        lyr.keep(lyr.mask(f,vectorized))
+        return self
+
+    def fill_pinyin(self,singers=None,overwrite:bool=False):
+        '''
+        按汉字歌词批量填写工程中的拼音，用于从midi或music21导入的拼音与汉字相同的工程，需要pypinyin
+        singers:音源索引，SingerRegistry或{音源名:Dvbank}，多音字优先使用音源发音列表中有的读音
+        overwrite:为True时所有汉字音符都重新填写拼音，默认只填写拼音缺失的音符
+        例如：d.fill_pinyin(SingerRegistry("D:/DeepVocal/voice"))
+        '''
+        fillpinyin(self.track,singers,overwrite)
+        return self
+
     def setsinger(self,singer:str):
         '''
         为工程中的所有区段统一设置音源名
@@ -1049,6 +2633,14 @@ class Dvfile():
             tr.setsinger(singer)
         return self
 
+    def columnar(self,on:bool=True):
+        '''
+        切换工程中所有区段的音符存储方式，见Dvsegment.columnar
+        '''
+        for tr in self.track:
+            tr.columnar(on)
+        return self
+
     def transpose(self,n:int):
         """
         对dv工程移调
@@ -1058,12 +2650,45 @@ class Dvfile():
             tr.transpose(n)
         return self
 
+    def to_midi_bytes(self,use_hanzi:bool=False)->bytes:
+        '''
+        将dv文件对象直接编码为mid文件内容，不需要mido
+        默认使用dv文件中的拼音，如果需要使用汉字，use_hanzi=True
+        '''
+        import io
+        f=io.BytesIO()
+        self.save_midi(f,use_hanzi)
+        return f.getvalue()
+
+    def save_midi(self,filename,use_hanzi:bool=False):
+        '''
+        将dv文件对象直接写为mid文件，不需要mido，也不构建mido.MidiFile对象
+        filename:文件名或可写的二进制文件对象
+        默认使用dv文件中的拼音，如果需要使用汉字，use_hanzi=True
+        '''
+        from dvfile.midi import writemidi
+        segments=[tr.merged(0) for tr in self.track]
+        if(isinstance(filename,str)):
+            with open(filename,"wb") as f:
+                writemidi(f,self.tempo,segments,use_hanzi)
+        else:
+            writemidi(filename,self.tempo,segments,use_hanzi)
+        return self
+
     def to_midi_file(self,filename:str="",use_hanzi:bool=False):
         '''
         将dv文件对象转换为mid文件与mido.MidiFile对象
         默认使用dv文件中的拼音，如果需要使用汉字，use_hanzi=True
+        mid文件由save_midi直接写出，未安装mido时只写文件，返回None
         '''
-        import mido
+        if(filename!=""):
+            self.save_midi(filename,use_hanzi)
+        try:
+            import mido
+        except ImportError:
+            if(filename==""):
+                raise
+            return None
         mid = mido.MidiFile()
         #控制轨
         ctrltrack=mido.MidiTrack()
@@ -1075,8 +2700,6 @@ class Dvfile():
         mid.tracks.append(ctrltrack)
         for i in self.track:
             mid.tracks.append(i.to_midi_track(use_hanzi))
-        if(filename!=""):
-            mid.save(filename)
         return mid
     
     def to_ust_file(self,use_hanzi:bool=False)->list:
@@ -1117,7 +2740,7 @@ class Dvfile():
         length=max(i.segment[-1].start+i.segment[-1].length for i in self.track)-starttime
         #转换音轨
         for tr in self.track:
-            u=sum(tr.segment,Dvsegment(start=starttime,length=0))
+            u=tr.merged(starttime)
             u.length=length
             u=u.to_ust_file(use_hanzi=use_hanzi)
             u.tempo=0#阻止Ustfile将曲速写入music21对象，交由dvfile来写
@@ -1161,7 +2784,7 @@ def to_dv_file(a)->Dvfile:
         "Dvtrack":lambda x:Dvfile(track=[copy.deepcopy(x)]),
         "Dvfile":copy.deepcopy,
         "MidiTrack":lambda x:Dvfile(track=[to_dv_track(x)]),
-        "MidiFile":lambda x:Dvfile(track=[Dvtrack(name=tr.name,segment=[midi_track_to_dv_segment(tr,ticks_per_beat=x.ticks_per_beat)]) for tr in x.tracks]),
+        "MidiFile":midi_file_to_dv_file,
         "Stream":lambda x:Dvfile(track=[to_dv_track(x)]),
         "Measure":lambda x:Dvfile(track=[to_dv_track(x)]),
         "Part":lambda x:Dvfile(track=[to_dv_track(x)]),
@@ -1170,129 +2793,222 @@ def to_dv_file(a)->Dvfile:
     #如果在这个字典中没有找到函数，则默认调用a.to_dv_file()
     return type_function_dict.get(type_name,lambda x:x.to_dv_file())(a)
 
-def opendv(filename:str)->Dvfile:
+def readdvnote(r:Skreader)->Dvnote:
     '''
-    打开sk或dv文件，返回Dvfile对象
+    从Skreader中读取一个音符
+    '''
+    from dvfile.data import notefixed
+    start=r.readint()
+    length=r.readint()
+    notenum=115-r.readint()
+    viblen=r.readint()#颤音长度
+    pinyin=r.readstr()
+    hanzi=r.readstr()
+    r.skip(1)
+    #数据块1,包含颤音幅度线、颤音速度线和渲染出的颤音音高曲线
+    end=r.readint()
+    end+=r.pos
+    r.skip(4)
+    vibamp=r.readarray(r.readint())#颤音幅度线
+    r.skip(4)
+    vibfre=r.readarray(r.readint())#颤音速度线
+    r.skip(4)
+    vibp=r.readarray(r.readint()).copy()
+    vibp[:,1]=-vibp[:,1]#渲染出的颤音音高曲线
+    r.pos=end
+    begin=r.pos
+    r.readbytes()#未知数据块2
+    r.skip(18)#音素
+    if(bytes(r.buf[begin:r.pos])==notefixed):#与默认值相同时不保存
+        fixed=None
+    else:
+        fixed=numpy.frombuffer(r.buf[begin:r.pos],dtype=numpy.uint8)
+    bendep=r.readint()#弯曲深度
+    benlen=r.readint()#弯曲长度
+    portail=r.readint()#尾部滑音长度
+    porhead=r.readint()#头部滑音长度
+    timbre=r.readint()#音阶
+    crolrc=r.readstr()#交叉拼音
+    crotim=r.readint()#交叉音阶
+    return Dvnote(start,
+                  length,
+                  notenum,
+                  pinyin,
+                  hanzi,
+                  benlen,
+                  bendep,
+                  porhead,
+                  portail,
+                  timbre,
+                  viblen,
+                  vibamp,
+                  vibfre,
+                  vibp,
+                  crolrc,
+                  crotim,
+                  fixed)
+
+def readdvsegment(r:Skreader,lazy:bool=False)->Dvsegment:
+    '''
+    从Skreader中读取一个区段
+    lazy:为True时只记录音符列表的位置，音符在第一次访问时才解码
+    区段的源数据记录在sourceblock中
+    '''
+    begin=r.pos
+    segstart=r.readint()
+    seglength=r.readint()
+    segname=r.readstr()
+    singer=r.readstr()
+    if(lazy):
+        noteblock=r.readblock()#音符占用空间
+        note=None
+    else:
+        r.skip(4)#音符占用空间
+        note=[readdvnote(r) for i in range(r.readint())]
+    #以下是区段参数
+    vol=r.readparam()#音量Volume，取值范围[0,256]
+    pit=r.readparam().copy()#音调Pitch，以音分为单位，转换成midi标准的100倍，0表示按默认音调
+    sgn=(numpy.sign(pit[:,1])+1)//2
+    pit[:,1]=sgn*(11550-pit[:,1])
+    r.readbytes()
+    bre=r.readparam()#气声Breathness，取值范围[0,256]
+    gen=r.readparam()#声线（性别）Gender，取值范围[0,256]
+    r.readbytes()
+    r.readbytes()
+    seg=Dvsegment(segstart,
+                  seglength,
+                  segname,
+                  singer,
+                  vol=vol,
+                  pit=pit,
+                  bre=bre,
+                  gen=gen)
+    if(lazy):
+        seg.noteblock=noteblock
+    seg.note=note
+    seg.sourceblock=Skblock(r.buf,begin,r.pos)
+    seg.sourceheader=(segstart,seglength,segname,singer)
+    seg.sourceparam=(vol,pit,bre,gen)
+    if(note is not None):
+        seg.sourcenote=note
+        seg.sourcestate=notestate(note)
+    return seg
+
+def loaddv(buf,lazy:bool=False)->Dvfile:
+    '''
+    从内存中的sk或dv文件数据解析Dvfile对象，不复制数据
+    buf:支持缓冲区协议的任意对象（bytes，bytearray，mmap等）
+    lazy:是否延迟解码，默认为False。为True时只解码曲速、节拍与音轨属性，
+        区段列表和音符列表只记录其在buf中的位置，第一次访问时才解码
+    vibamp、vibfre与Dvnote.fixed为buf上的视图，buf只读时这些数据也只读
     '''
     from dvfile.data import balanceread
-    with open(filename,"rb") as file:
-        #文件头
-        file.read(48)
-        #读曲速标记
-        tempo=[]
-        for i in range(0,skreadint(file)):
-            tempo+=[(skreadint(file),skreadint(file)/100)]
-        file.read(4)
-        #读节拍标记
-        beats=[]
-        for i in range(0,skreadint(file)):
-            beats+=[(skreadint(file),skreadint(file),skreadint(file))]
-        track=[]
-        inst=[]
-        for i in range(0,skreadint(file)):#读音轨
-            tracktype=skreadint(file)#合成音轨0，伴奏1
-            if(tracktype==0):#合成音轨
-                trackname=skreadstr(file)
-                mute=(file.read(1)==b'\x01')
-                solo=(file.read(1)==b'\x01')
-                volume=skreadint(file)
-                balance=balanceread.get(file.read(4),0)#左右声道平衡
-                file.read(4)#区段占用空间
-                segment=[]
-                for i in range(0,skreadint(file)):#读区段
-                    segstart=skreadint(file)
-                    seglength=skreadint(file)
-                    segname=skreadstr(file)
-                    singer=skreadstr(file)
-                    file.read(4)#音符占用空间
-                    note=[]
-                    for i in range(0,skreadint(file)):#读音符
-                        start=skreadint(file)
-                        length=skreadint(file)
-                        notenum=115-skreadint(file)
-                        viblen=skreadint(file)#颤音长度
-                        pinyin=skreadstr(file)
-                        hanzi=skreadstr(file)
-                        file.read(1)
-                        #以下是数据块1,包含颤音幅度线和颤音速度线
-                        data1=numpy.fromfile(file,"<i4",skreadint(file)//4)#未知数据块1,包含滑音幅度线和频率线
-                        vibamp=data1[2:2+data1[1]*2].reshape([-1,2])#颤音幅度线
-                        data1=data1[2+data1[1]*2:]
-                        vibfre=data1[2:2+data1[1]*2].reshape([-1,2])#颤音速度线
-                        data1=data1[2+data1[1]*2:]
-                        vibp=data1[2:2+data1[1]*2].reshape([-1,2])
-                        vibp[:,1]=-vibp[:,1]#渲染出的颤音音高曲线
-                        #以上是未知数据块1
-                        data2=skreadbytes(file)#未知数据块2
-                        file.read(18)#音素
-                        bendep=skreadint(file)#弯曲深度
-                        benlen=skreadint(file)#弯曲长度
-                        portail=skreadint(file)#尾部滑音长度
-                        porhead=skreadint(file)#头部滑音长度
-                        timbre=skreadint(file)#音阶
-                        crolrc=skreadstr(file)#交叉拼音
-                        crotim=skreadint(file)#交叉音阶
-                        note+=[Dvnote(start,
-                                      length,
-                                      notenum,
-                                      pinyin,
-                                      hanzi,
-                                      benlen,
-                                      bendep,
-                                      porhead,
-                                      portail,
-                                      timbre,
-                                      viblen,
-                                      vibamp,
-                                      vibfre,
-                                      vibp,
-                                      crolrc,
-                                      crotim)]
-                    #以下是区段参数
-                    #音量Volume，取值范围[0,256]
-                    vol=numpy.fromfile(file,"<i4",skreadint(file)//4)[1:].reshape([-1,2])
-                    #return numpy.fromfile(file,"<i4",skreadint(file)//4)
-                    #音调Pitch，以音分为单位，转换成midi标准的100倍，0表示按默认音调
-                    pit=numpy.fromfile(file,"<i4",skreadint(file)//4)[1:].reshape([-1,2])
-                    sgn=(numpy.sign(pit[:,1])+1)//2
-                    pit[:,1]=sgn*(11550-pit[:,1])
-                    skreadbytes(file)
-                    #气声Breathness，取值范围[0,256]
-                    bre=numpy.fromfile(file,"<i4",skreadint(file)//4)[1:].reshape([-1,2])
-                    #声线（性别）Gender，取值范围[0,256]
-                    gen=numpy.fromfile(file,"<i4",skreadint(file)//4)[1:].reshape([-1,2])
-                    skreadbytes(file)
-                    skreadbytes(file)
-                    segment+=[Dvsegment(segstart,
-                                        seglength,
-                                        segname,
-                                        singer,
-                                        note,
-                                        vol=vol,
-                                        pit=pit,
-                                        bre=bre,
-                                        gen=gen)]
-                track+=[Dvtrack(trackname,segment,volume,balance,mute,solo)]
-            else:#伴奏音轨
-                trackname=skreadstr(file)
-                mute=(file.read(1)==b'\x01')
-                solo=(file.read(1)==b'\x01')
-                volume=skreadint(file)
-                file.read(4)#左右声道平衡
-                file.read(4)#区段占用空间
-                if(skreadint(file)>0):#如果为0，则为空伴奏音轨
-                    segstart=skreadint(file)
-                    seglength=skreadint(file)
-                    skreadstr(file)
-                    fname=skreadstr(file)
-                    inst+=[Dvinst(segstart,seglength,fname,trackname,volume,mute,solo)]
+    r=Skreader(buf,48)#文件头
+    #读曲速标记
+    tempo=[]
+    for i in range(0,r.readint()):
+        tempo+=[(r.readint(),r.readint()/100)]
+    r.skip(4)
+    #读节拍标记
+    beats=[]
+    for i in range(0,r.readint()):
+        beats+=[(r.readint(),r.readint(),r.readint())]
+    track=[]
+    inst=[]
+    for i in range(0,r.readint()):#读音轨
+        begin=r.pos
+        tracktype=r.readint()#合成音轨0，伴奏1
+        trackname=r.readstr()
+        mute=r.readbool()
+        solo=r.readbool()
+        volume=r.readint()
+        if(tracktype==0):#合成音轨
+            balance=balanceread.get(bytes(r.buf[r.pos:r.pos+4]),0)#左右声道平衡
+            r.skip(4)
+            if(lazy):
+                tr=Dvtrack(trackname,[],volume,balance,mute,solo)
+                tr.segmentblock=r.readblock()#区段占用空间
+                tr.segment=None
+            else:
+                r.skip(4)#区段占用空间
+                segment=[readdvsegment(r) for i in range(r.readint())]
+                tr=Dvtrack(trackname,segment,volume,balance,mute,solo)
+                tr.sourcesegment=segment
+            tr.sourceblock=Skblock(r.buf,begin,r.pos)
+            track+=[tr]
+        else:#伴奏音轨
+            r.skip(8)#左右声道平衡，区段占用空间
+            if(r.readint()>0):#如果为0，则为空伴奏音轨
+                segstart=r.readint()
+                seglength=r.readint()
+                r.readstr()
+                fname=r.readstr()
+                inst+=[Dvinst(segstart,seglength,fname,trackname,volume,mute,solo)]
     return Dvfile(tempo=tempo,beats=beats,track=track,inst=inst)
 
-def main():
-    import mido
-    m=mido.MidiFile(r"gthl.mid")
-    d=to_dv_file(m)
-    d.save(r"gthl.dv")
+def opendv(filename:str,mmap:bool=False,lazy:bool=False,cache:Union[bool,str]=False)->Dvfile:
+    '''
+    打开sk或dv文件，返回Dvfile对象
+    mmap:是否用内存映射读取，默认为False。
+        为True时，文件只映射一次并按偏移量解码，vibamp、vibfre与Dvnote.fixed直接引用映射的内存。
+        映射为写时复制，修改这些曲线不会写回文件。
+    lazy:是否延迟解码，默认为False。
+        为True时，Dvtrack.segment与Dvsegment.note在第一次访问时才解码，
+        只需要音轨名、曲速、节拍等信息时，打开大工程的耗时几乎与工程大小无关。
+    打开的工程保留源数据，保存时未修改的音轨与区段直接复制源数据，见Dvsegment.ischanged
+    cache:是否使用磁盘缓存，默认为False。为True时使用默认缓存目录（见dvfile.cache.defaultcachedir），也可以直接给出缓存目录。
+        缓存以文件路径、修改时间与大小为键，命中时不解析文件，lazy不起作用；未命中时解析文件并写入缓存。
+        从缓存读取的工程没有源数据，保存时所有音轨都完整编码，不能原样复制未修改的部分。缓存写入失败时不报错。
+    '''
+    if(cache):
+        from dvfile.cache import sourcekey,readcache,writecache
+        cachedir=None if cache is True else cache
+        d=readcache(filename,cachedir)
+        if(d is None):
+            key=sourcekey(filename)
+            d=opendv(filename,mmap=mmap)
+            writecache(d,filename,cachedir,key=key)
+        return d
+    if(mmap):
+        import mmap as mm
+        with open(filename,"rb") as file:
+            buf=mm.mmap(file.fileno(),0,access=mm.ACCESS_COPY)
+        d=loaddv(buf,lazy=lazy)
+        d.mmapfile=os.path.abspath(filename)
+        return d
+    with open(filename,"rb") as file:
+        buf=bytearray(file.read())
+    return loaddv(buf,lazy=lazy)
+
+def loadmidi(buf,columnar:bool=False)->Dvfile:
+    '''
+    从内存中的mid文件数据解析Dvfile对象，不需要mido
+    每个有音符的midi音轨转为一个dv音轨，曲速与拍号写入Dvfile.tempo与Dvfile.beats
+    columnar:为True时区段的音符为按列存储的Dvnotetable，音符很多时更快，默认为Dvnote列表
+    '''
+    from dvfile.midi import readmidi,todvfile
+    return todvfile(*readmidi(buf),columnar=columnar)
+
+def openmidi(filename:str,mmap:bool=False,columnar:bool=False)->Dvfile:
+    '''
+    打开mid文件，返回Dvfile对象，不需要mido，见loadmidi
+    mmap:是否用内存映射读取，默认为False
+    columnar:见loadmidi
+    '''
+    with open(filename,"rb") as file:
+        if(mmap):
+            import mmap as mm
+            buf=mm.mmap(file.fileno(),0,access=mm.ACCESS_READ)
+        else:
+            buf=file.read()
+    return loadmidi(buf,columnar)
+
+def main(argv:List[str]=None)->int:
+    '''
+    命令行批量转换，见dvfile.convert
+    '''
+    from dvfile.convert import main
+    return main(argv)
     
 if(__name__=="__main__"):
     main()
\ No newline at end of file
@@ -0,0 +1,4 @@
+import sys
+from dvfile.convert import main
+
+sys.exit(main())
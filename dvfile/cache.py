@@ -0,0 +1,235 @@
+'''
+dv工程的磁盘缓存
+解析后的工程按列存储在缓存目录中，以源文件的路径、修改时间和大小为键，源文件变化后缓存自动失效
+缓存文件格式：8字节标识，8字节头部长度，json头部，按8字节对齐的各数组数据
+不使用pickle，读取时整个文件只映射一次，数组直接引用映射的内存
+'''
+import os
+import json
+import struct
+import hashlib
+import numpy
+from typing import List,Dict,Tuple
+
+magic=b"DVCACHE1"
+
+#缓存目录的默认总大小上限，字节
+defaultmaxsize:int=1<<28
+
+def defaultcachedir()->str:
+    '''
+    默认缓存目录：环境变量DVFILE_CACHE，未设置时为~/.cache/dvfile
+    '''
+    return os.environ.get("DVFILE_CACHE",os.path.join(os.path.expanduser("~"),".cache","dvfile"))
+
+def cachepath(filename:str,cachedir:str=None)->str:
+    '''
+    返回filename对应的缓存文件路径
+    '''
+    if(cachedir is None):
+        cachedir=defaultcachedir()
+    key=hashlib.sha1(os.path.abspath(filename).encode("utf8")).hexdigest()
+    return os.path.join(cachedir,key+".dvc")
+
+def sourcekey(filename:str)->list:
+    #缓存的键：[绝对路径,修改时间(纳秒),大小]
+    st=os.stat(filename)
+    return [os.path.abspath(filename),st.st_mtime_ns,st.st_size]
+
+def encodecolumns(d)->Tuple[dict,Dict[str,numpy.ndarray]]:
+    '''
+    将Dvfile转为json头部与数组字典
+    所有区段的音符合并为一张音符表，颤音曲线与曲线参数分别首尾相接，另存每个音符/区段的点数
+    '''
+    from dvfile import Dvnotetable,defaultvibamp,defaultvibfre,defaultvibp
+    segments=[seg for tr in d.track for seg in tr.segment]
+    tables=[(seg.note if isinstance(seg.note,Dvnotetable) else Dvnotetable(list(seg.note))) for seg in segments]
+    t=Dvnotetable.concat(tables,[0]*len(tables))
+    arrays={}
+    arrays["segnote"]=numpy.array([len(i) for i in tables],dtype=numpy.int64)
+    arrays["int"]=numpy.column_stack([getattr(t,name) for name in t.intcolumns]).astype(numpy.int64).reshape([-1,len(t.intcolumns)])
+    arrays["lyric"]=numpy.column_stack([getattr(t,name) for name in t.lyriccolumns]).astype(numpy.int64).reshape([-1,len(t.lyriccolumns)])
+    #颤音曲线，点数为-1表示使用默认曲线
+    for (name,default) in (("vibamp",defaultvibamp),("vibfre",defaultvibfre),("vibp",defaultvibp)):
+        curves=getattr(t,name)
+        arrays[name+"count"]=numpy.array([(-1 if c is default else len(c)) for c in curves],dtype=numpy.int64)
+        arrays[name]=numpy.concatenate([numpy.zeros([0,2],dtype="<i4")]+[numpy.asarray(c,dtype="<i4").reshape([-1,2]) for c in curves if c is not default])
+    #数据块2与音素，长度为-1表示默认值
+    arrays["fixedcount"]=numpy.array([(-1 if f is None else len(f)) for f in t.fixed],dtype=numpy.int64)
+    arrays["fixed"]=numpy.frombuffer(b"".join([f for f in t.fixed if f is not None]),dtype=numpy.uint8)
+    #区段曲线参数
+    for name in ("vol","pit","bre","gen"):
+        curves=[getattr(seg,name) for seg in segments]
+        arrays[name+"count"]=numpy.array([len(c) for c in curves],dtype=numpy.int64)
+        arrays[name]=numpy.concatenate([numpy.zeros([0,2],dtype=numpy.int64)]+[c.points.astype(numpy.int64) for c in curves])
+    header={
+        "tempo":[list(i) for i in d.tempo],
+        "beats":[list(i) for i in d.beats],
+        "lyrics":t.lyrics,
+        "track":[{"name":tr.name,
+                  "volume":tr.volume,
+                  "balance":tr.balance,
+                  "mute":tr.mute,
+                  "solo":tr.solo,
+                  "segment":[[seg.start,seg.length,seg.name,seg.singer] for seg in tr.segment]} for tr in d.track],
+        "inst":[[i.start,i.length,i.filename,i.name,i.volume,i.mute,i.solo] for i in d.inst],
+    }
+    return (header,arrays)
+
+def splitcurves(points:numpy.ndarray,count:numpy.ndarray,default:numpy.ndarray=None)->list:
+    #按点数将首尾相接的曲线拆开，点数为-1的位置为default
+    if(len(count)==0):
+        return []
+    end=numpy.cumsum(numpy.maximum(count,0)).tolist()
+    curves=[points[a:b] for (a,b) in zip([0]+end[:-1],end)]
+    if(default is not None):
+        for i in numpy.flatnonzero(count<0).tolist():
+            curves[i]=default
+    return curves
+
+def decodecolumns(header:dict,arrays:Dict[str,numpy.ndarray]):
+    '''
+    由json头部与数组字典重建Dvfile，音符为独立的Dvnote对象
+    '''
+    from dvfile import Dvfile,Dvtrack,Dvsegment,Dvinst,Dvnote,Dvnotetable,defaultvibamp,defaultvibfre,defaultvibp
+    lyrics=header["lyrics"]
+    ints=dict(zip(Dvnotetable.intcolumns,arrays["int"].T.tolist()))
+    lyric=dict(zip(Dvnotetable.lyriccolumns,([lyrics[i] for i in c] for c in arrays["lyric"].T.tolist())))
+    vibamp=splitcurves(arrays["vibamp"],arrays["vibampcount"],defaultvibamp)
+    vibfre=splitcurves(arrays["vibfre"],arrays["vibfrecount"],defaultvibfre)
+    vibp=splitcurves(arrays["vibp"],arrays["vibpcount"],defaultvibp)
+    fixed=splitcurves(arrays["fixed"],arrays["fixedcount"])
+    for i in numpy.flatnonzero(arrays["fixedcount"]<0).tolist():
+        fixed[i]=None
+    note=list(map(Dvnote,
+        ints["start"],ints["length"],ints["notenum"],lyric["pinyin"],lyric["hanzi"],
+        ints["benlen"],ints["bendep"],ints["porhead"],ints["portail"],ints["timbre"],ints["viblen"],
+        vibamp,vibfre,vibp,lyric["crolrc"],ints["crotim"],fixed))
+    curves={name:splitcurves(arrays[name],arrays[name+"count"]) for name in ("vol","pit","bre","gen")}
+    segbegin=numpy.concatenate([[0],numpy.cumsum(arrays["segnote"])]).tolist()
+    track=[]
+    k=0
+    for tr in header["track"]:
+        segment=[]
+        for (start,length,name,singer) in tr["segment"]:
+            segment.append(Dvsegment(start,length,name,singer,note[segbegin[k]:segbegin[k+1]],
+                vol=curves["vol"][k],pit=curves["pit"][k],bre=curves["bre"][k],gen=curves["gen"][k]))
+            k+=1
+        track.append(Dvtrack(tr["name"],segment,tr["volume"],tr["balance"],tr["mute"],tr["solo"]))
+    inst=[Dvinst(*i) for i in header["inst"]]
+    return Dvfile(tempo=[tuple(i) for i in header["tempo"]],
+                  beats=[tuple(i) for i in header["beats"]],
+                  track=track,
+                  inst=inst)
+
+def writecache(d,filename:str,cachedir:str=None,maxsize:int=defaultmaxsize,key:list=None):
+    '''
+    将从filename解析出的Dvfile对象d写入缓存，写入后按maxsize清理缓存目录
+    key:解析前取得的sourcekey(filename)，防止解析期间源文件被修改，为None时现在读取
+    先写临时文件再替换，正在被映射的旧缓存不受影响；写入失败时不报错
+    '''
+    if(key is None):
+        key=sourcekey(filename)
+    path=cachepath(filename,cachedir)
+    (header,arrays)=encodecolumns(d)
+    header["source"]=key
+    header["arrays"]={}
+    offset=0
+    for (name,ar) in arrays.items():
+        header["arrays"][name]=[ar.dtype.str,list(ar.shape),offset]
+        offset+=(ar.nbytes+7)//8*8
+    head=json.dumps(header,ensure_ascii=False).encode("utf8")
+    head+=b" "*(-len(head)%8)
+    tmp="{}.{}.tmp".format(path,os.getpid())
+    #缓存只用于加速，无法写入（目录不可写、磁盘已满、旧缓存被占用等）时放弃写入
+    try:
+        os.makedirs(os.path.dirname(path),exist_ok=True)
+        with open(tmp,"wb") as file:
+            file.write(magic)
+            file.write(struct.pack("<q",len(head)))
+            file.write(head)
+            for ar in arrays.values():
+                file.write(numpy.ascontiguousarray(ar).tobytes())
+                file.write(b"\0"*(-ar.nbytes%8))
+        os.replace(tmp,path)
+        evict(os.path.dirname(path),maxsize)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+def readcache(filename:str,cachedir:str=None):
+    '''
+    从缓存读取filename对应的Dvfile对象，没有缓存或缓存已失效时返回None，缓存文件损坏时删除该缓存并返回None
+    命中时更新缓存文件的访问时间，用于LRU清理
+    '''
+    import mmap
+    path=cachepath(filename,cachedir)
+    try:
+        with open(path,"rb") as file:
+            buf=mmap.mmap(file.fileno(),0,access=mmap.ACCESS_COPY)
+    except (OSError,ValueError):
+        return None
+    try:
+        if(buf[:8]!=magic):
+            return None
+        (headsize,)=struct.unpack("<q",buf[8:16])
+        header=json.loads(bytes(buf[16:16+headsize]).decode("utf8"))
+        if(header["source"]!=sourcekey(filename)):
+            return None
+        base=16+headsize
+        arrays={}
+        for (name,(dtype,shape,offset)) in header["arrays"].items():
+            count=int(numpy.prod(shape))
+            arrays[name]=numpy.frombuffer(buf,dtype=dtype,count=count,offset=base+offset).reshape(shape)
+        d=decodecolumns(header,arrays)
+    except (ValueError,KeyError,IndexError,TypeError,struct.error):#缓存文件损坏（json.JSONDecodeError、UnicodeDecodeError均为ValueError）
+        #删除损坏的缓存，由调用者重新解析
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    os.utime(path)
+    return d
+
+def evict(cachedir:str=None,maxsize:int=defaultmaxsize):
+    '''
+    按最近使用时间从旧到新删除缓存文件，直到缓存目录总大小不超过maxsize
+    '''
+    if(cachedir is None):
+        cachedir=defaultcachedir()
+    files=[]
+    for entry in os.scandir(cachedir):
+        if(entry.name.endswith(".dvc")):
+            st=entry.stat()
+            files.append((st.st_mtime_ns,st.st_size,entry.path))
+    files.sort()
+    total=sum(i[1] for i in files)
+    for (mtime,size,path) in files:
+        if(total<=maxsize):
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total-=size
+
+def invalidate(filename:str=None,cachedir:str=None):
+    '''
+    删除filename对应的缓存，filename为None时清空整个缓存目录
+    '''
+    if(filename is not None):
+        paths=[cachepath(filename,cachedir)]
+    else:
+        if(cachedir is None):
+            cachedir=defaultcachedir()
+        if(not os.path.isdir(cachedir)):
+            return
+        paths=[os.path.join(cachedir,name) for name in os.listdir(cachedir) if name.endswith(".dvc")]
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
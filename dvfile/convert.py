@@ -0,0 +1,182 @@
+'''
+批量转换目录树中的工程文件
+用法：python -m dvfile 源目录 目标目录 --to mid
+支持格式：dv, mid, ust, nn, musicxml
+'''
+import os
+import sys
+import time
+from typing import List,Tuple,Dict
+
+#扩展名到格式的字典
+extformat:Dict[str,str]={
+    ".dv":"dv",
+    ".sk":"dv",
+    ".mid":"mid",
+    ".midi":"mid",
+    ".ust":"ust",
+    ".nn":"nn",
+    ".musicxml":"musicxml",
+    ".mxl":"musicxml",
+}
+
+#只在明确指定源格式（--from）时才转换的扩展名，避免把无关的xml文件当作musicxml
+explicitext:Dict[str,str]={
+    ".xml":"musicxml",
+}
+
+#格式到输出扩展名的字典
+formatext:Dict[str,str]={
+    "dv":".dv",
+    "mid":".mid",
+    "ust":".ust",
+    "nn":".nn",
+    "musicxml":".musicxml",
+}
+
+def readfile(filename:str):
+    '''
+    按扩展名打开文件，返回Dvfile对象
+    '''
+    import dvfile
+    ext=os.path.splitext(filename)[1].lower()
+    fmt=extformat.get(ext) or explicitext[ext]
+    if(fmt=="dv"):
+        return dvfile.opendv(filename,mmap=True)
+    elif(fmt=="mid"):
+        return dvfile.openmidi(filename,mmap=True,columnar=True)
+    elif(fmt=="ust"):
+        import utaufile
+        return dvfile.to_dv_file(utaufile.openust(filename))
+    elif(fmt=="nn"):
+        import utaufile
+        return dvfile.to_dv_file(utaufile.opennn(filename))
+    else:
+        import music21
+        return dvfile.to_dv_file(music21.converter.parse(filename))
+
+def writefile(d,filename:str,to:str,use_hanzi:bool=False)->List[str]:
+    '''
+    将Dvfile对象d保存为to格式，返回写出的文件列表
+    ust与nn每个音轨一个文件，多于一个音轨时文件名后加音轨序号
+    '''
+    if(to=="dv"):
+        d.save(filename)
+        return [filename]
+    elif(to=="mid"):
+        d.save_midi(filename,use_hanzi=use_hanzi)
+        return [filename]
+    elif(to=="musicxml"):
+        d.to_music21_score(use_hanzi=use_hanzi).write("musicxml",fp=filename)
+        return [filename]
+    if(to=="ust"):
+        files=d.to_ust_file(use_hanzi=use_hanzi)
+    else:
+        files=d.to_nn_file()
+    if(len(files)==1):
+        names=[filename]
+    else:
+        stem,ext=os.path.splitext(filename)
+        names=["{}_{}{}".format(stem,i,ext) for i in range(len(files))]
+    for (f,name) in zip(files,names):
+        f.save(name)
+    return names
+
+def convertfile(src:str,dst:str,to:str,use_hanzi:bool=False)->Tuple[str,int,float]:
+    '''
+    转换单个文件，返回(源文件,源文件大小,耗时)
+    '''
+    t=time.perf_counter()
+    os.makedirs(os.path.dirname(dst) or ".",exist_ok=True)
+    writefile(readfile(src),dst,to,use_hanzi)
+    return (src,os.path.getsize(src),time.perf_counter()-t)
+
+def findfiles(srcdir:str,dstdir:str,to:str,inputs:set,explicit:bool=False)->List[Tuple[str,str]]:
+    '''
+    在srcdir中查找格式属于inputs的文件，返回(源文件,目标文件)列表，目标文件保持相对路径
+    explicit:inputs是否由用户明确指定，为True时才查找explicitext中的扩展名
+    '''
+    jobs=[]
+    for (root,dirs,files) in os.walk(srcdir):
+        dirs.sort()
+        for name in sorted(files):
+            (stem,ext)=os.path.splitext(name)
+            ext=ext.lower()
+            fmt=extformat.get(ext) or (explicitext.get(ext) if explicit else None)
+            if(fmt in inputs):
+                src=os.path.join(root,name)
+                rel=os.path.relpath(os.path.join(root,stem),srcdir)
+                jobs.append((src,os.path.join(dstdir,rel+formatext[to])))
+    return jobs
+
+def findconflicts(jobs:List[Tuple[str,str]])->Dict[str,List[str]]:
+    '''
+    找出多个源文件对应同一目标文件的情况（如a.mid与a.ust），返回{目标文件:[源文件]}
+    '''
+    dsts={}
+    for (src,dst) in jobs:
+        dsts.setdefault(os.path.normcase(os.path.normpath(dst)),[]).append((src,dst))
+    return {group[0][1]:[src for (src,dst) in group] for group in dsts.values() if len(group)>1}
+
+def convertdir(srcdir:str,
+               dstdir:str,
+               to:str,
+               inputs:set=None,
+               jobs:int=None,
+               use_hanzi:bool=False,
+               out=sys.stdout)->Tuple[int,int]:
+    '''
+    用进程池批量转换srcdir下的所有文件到dstdir，单个文件出错时记录错误并继续
+    to:目标格式
+    inputs:要转换的源格式集合，默认为除目标格式外的所有格式，明确指定时才转换.xml文件
+    jobs:进程数，默认为cpu数
+    多个源文件对应同一目标文件时都不转换，记为失败
+    返回：(成功数,失败数)
+    '''
+    from concurrent.futures import ProcessPoolExecutor,as_completed
+    explicit=inputs is not None
+    if(inputs is None):
+        inputs=set(formatext)-{to}
+    filelist=findfiles(srcdir,dstdir,to,inputs,explicit)
+    ok=0
+    failed=0
+    conflicts=findconflicts(filelist)
+    for (dst,srcs) in conflicts.items():
+        failed+=len(srcs)
+        print("conflict {}: {}".format(dst,", ".join(srcs)),file=out)
+    if(conflicts):
+        skipped=set(src for srcs in conflicts.values() for src in srcs)
+        filelist=[(src,dst) for (src,dst) in filelist if src not in skipped]
+    size=0
+    start=time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures={pool.submit(convertfile,src,dst,to,use_hanzi):src for (src,dst) in filelist}
+        for future in as_completed(futures):
+            src=futures[future]
+            try:
+                (src,n,t)=future.result()
+            except Exception as e:
+                failed+=1
+                print("error {}: {}: {}".format(src,type(e).__name__,e),file=out)
+                continue
+            ok+=1
+            size+=n
+            print("ok {} {:.1f}KB {:.1f}ms {:.2f}MB/s".format(src,n/1024,t*1000,n/1048576/max(t,1e-9)),file=out)
+    t=time.perf_counter()-start
+    print("{} converted, {} failed, {:.2f}s, {:.1f} files/s, {:.2f}MB/s".format(
+        ok,failed,t,(ok+failed)/max(t,1e-9),size/1048576/max(t,1e-9)),file=out)
+    return (ok,failed)
+
+def main(argv:List[str]=None)->int:
+    import argparse
+    parser=argparse.ArgumentParser(prog="python -m dvfile",description="批量转换目录中的dv/mid/ust/nn/musicxml文件")
+    parser.add_argument("src",help="源目录")
+    parser.add_argument("dst",help="目标目录，保持源目录的结构")
+    parser.add_argument("--to",required=True,choices=sorted(formatext),help="目标格式")
+    parser.add_argument("--from",dest="inputs",nargs="+",choices=sorted(formatext),help="只转换这些源格式，默认为除目标格式外的所有格式；指定musicxml时也转换.xml文件")
+    parser.add_argument("-j","--jobs",type=int,default=None,help="进程数，默认为cpu数")
+    parser.add_argument("--use-hanzi",action="store_true",help="导出时使用汉字歌词")
+    args=parser.parse_args(argv)
+    inputs=set(args.inputs) if args.inputs else None
+    (ok,failed)=convertdir(args.src,args.dst,args.to,inputs,args.jobs,args.use_hanzi)
+    return int(failed>0)
@@ -1,8 +1,11 @@
+# -*- coding: gbk -*-
+import os
+import re
 import struct
 from typing import List,Tuple,Dict
 
 def skreadint(file)->int:
-    return struct.unpack("l",file.read(4))[0]
+    return struct.unpack("<l",file.read(4))[0]
 
 def skreadbytes(file)->bytes:
     return file.read(skreadint(file))
@@ -17,7 +20,7 @@ def skwritebool(n:bool)->bytes:
     return bytes([int(n)])
 
 def skwriteint(n:int)->bytes:
-    return struct.pack("l",n)
+    return struct.pack("<l",n)
 
 def skwritebytes(s:bytes)->bytes:
     return skwriteint(len(s))+s
@@ -76,23 +79,38 @@ class Dvtbfile():
         self.singer:str=singer
 
     def __bytes__(self):
-        b=(b'SHARPKEYTOOLBOX\x01\x00\x00\x00\x12\x13\x00\x00\x00\x00\x00\x00'
-           +skwritestr("\r\n".join([",".join(line) for line in self.symbol]))
-           +skwritestr("\r\n".join([",".join(line) for line in self.vowel]))
-           +skwritestr("\r\n".join(self.voicon))
-           +skwritestr("\r\n".join(self.unvcon))
-           +skwritestr("\r\n".join(self.inde))
-           +skwritestr("\r\n".join(self.tail))
-           +skwriteint(len(self.wavpath)))
-        for i in self.wavpath:
-            b+=skwritestr(i)
-        b+=(skwritebool(self.build_all_models)
-            +skwritestr(self.build_which_models)
-            +skwritestr(self.modelpath)
-            +skwritestr(self.outputpath)
-            +skwritestr(",".join(self.pitch))
-            +skwritestr(self.singer))
-        return b
+        #ȷбһƴӣwavܶʱʱΪ
+        b=[b'SHARPKEYTOOLBOX\x01\x00\x00\x00\x12\x13\x00\x00\x00\x00\x00\x00',
+           skwritestr("\r\n".join([",".join(line) for line in self.symbol])),
+           skwritestr("\r\n".join([",".join(line) for line in self.vowel])),
+           skwritestr("\r\n".join(self.voicon)),
+           skwritestr("\r\n".join(self.unvcon)),
+           skwritestr("\r\n".join(self.inde)),
+           skwritestr("\r\n".join(self.tail)),
+           skwriteint(len(self.wavpath))]
+        b+=map(skwritestr,self.wavpath)
+        b+=[skwritebool(self.build_all_models),
+            skwritestr(self.build_which_models),
+            skwritestr(self.modelpath),
+            skwritestr(self.outputpath),
+            skwritestr(",".join(self.pitch)),
+            skwritestr(self.singer)]
+        return b"".join(b)
+
+    def pron(self):
+        '''
+        ɷбɱķֵ䣬dvfile.singer.Dvpron
+        '''
+        from dvfile.singer import Dvpron
+        return Dvpron.of(self)
+
+    def setcorpus(self,root:str,jobs:int=None,pitchof=None)->List[Tuple[str,str]]:
+        '''
+        ¼Ŀ¼дwavpathpitchscancorpus
+        أЧwavļб[(ļ,ԭ)]
+        '''
+        (self.wavpath,self.pitch,bad)=scancorpus(root,jobs,pitchof)
+        return bad
     
     def save(self,filename:str):
         '''
@@ -102,6 +120,83 @@ class Dvtbfile():
         with open(filename,mode="wb") as file:
             file.write(bytes(self))
     
+def checkwav(filename:str)->str:
+    '''
+    wavļͷֻȡݿͷȡƵ
+    أļЧʱNone򷵻ԭstr
+    '''
+    try:
+        with open(filename,"rb") as file:
+            head=file.read(12)
+            if(len(head)<12 or head[0:4]!=b"RIFF" or head[8:12]!=b"WAVE"):
+                return "not a RIFF WAVE file"
+            fmt=None
+            while(True):
+                chunk=file.read(8)
+                if(len(chunk)<8):
+                    return "no data chunk" if fmt else "no fmt chunk"
+                (chunkid,size)=(chunk[0:4],struct.unpack("<L",chunk[4:8])[0])
+                if(chunkid==b"fmt "):
+                    if(size<16):
+                        return "fmt chunk too short"
+                    fmt=file.read(16)
+                    if(len(fmt)<16):
+                        return "fmt chunk too short"
+                    fmt=struct.unpack("<HHLLHH",fmt)
+                    file.seek(size-16+(size&1),1)
+                elif(chunkid==b"data"):
+                    break
+                else:
+                    file.seek(size+(size&1),1)#ݿ鰴2ֽڶ
+    except OSError as e:
+        return str(e)
+    if(fmt is None):
+        return "data chunk before fmt chunk"
+    (formattag,channels,samplerate,byterate,blockalign,bits)=fmt
+    if(formattag not in (1,3,0xfffe)):
+        return "unsupported format tag {}".format(formattag)
+    if(channels<1 or samplerate<1 or bits not in (8,16,24,32)):
+        return "invalid fmt: {} channels, {}Hz, {} bits".format(channels,samplerate,bits)
+    return None
+
+def pitchnum(pitch:str)->int:
+    '''
+    תΪmidiߣ"C4"Ϊ60"C#4""Db4"Ϊ61ʱNone
+    '''
+    m=re.fullmatch(r"([A-Ga-g])([#b]?)(-?\d+)",pitch)
+    if(m is None):
+        return None
+    (name,accidental,octave)=m.groups()
+    return "C D EF G A B".index(name.upper())+{"":0,"#":1,"b":-1}[accidental]+(int(octave)+1)*12
+
+def parentpitch(filename:str)->str:
+    #ĬϵߣwavļΪC4ʱΪߣΪNone
+    name=os.path.basename(os.path.dirname(filename))
+    return name if pitchnum(name) is not None else None
+
+def scancorpus(root:str,jobs:int=None,pitchof=None)->Tuple[List[str],List[str],List[Tuple[str,str]]]:
+    '''
+    ¼Ŀ¼root̳߳زмwavļͷdvtbwav·бб
+    root¼Ŀ¼һÿһļУC4D#4
+    jobs߳ĬThreadPoolExecutor
+    pitchofwav·õĺĬȡļparentpitchNoneʾб
+    أ(Чwav·б,б,[(Чwav·,ԭ)])wav·Ŀ¼˳
+    '''
+    from concurrent.futures import ThreadPoolExecutor
+    if(pitchof is None):
+        pitchof=parentpitch
+    files=[]
+    for (dirpath,dirs,filenames) in os.walk(root):
+        dirs.sort()
+        files+=[os.path.join(dirpath,name) for name in sorted(filenames) if name.lower().endswith(".wav")]
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        errors=list(pool.map(checkwav,files))
+    wavpath=[f for (f,e) in zip(files,errors) if e is None]
+    bad=[(f,e) for (f,e) in zip(files,errors) if e is not None]
+    pitch=set(filter(None,map(pitchof,wavpath)))
+    pitch=sorted(pitch,key=lambda p:(pitchnum(p) is None,pitchnum(p) or 0,p))
+    return (wavpath,pitch,bad)
+
 def opendvtb(filename:str)->Dvtbfile:
     '''
     dvtbļDvtbfile
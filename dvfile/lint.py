@@ -0,0 +1,192 @@
+'''
+dv工程检查
+只读取工程，不修改、不复制，每个区段的音符按列一次性检查，返回问题列表
+可以检查的问题见kinds，修复请使用Dvfile.fix等函数
+'''
+import struct
+import operator
+import numpy
+from typing import List,Tuple,Dict
+
+#问题类型到说明的字典
+kinds:Dict[str,str]={
+    "unsorted":"音符未按开始时间排序",
+    "overlap":"音符重叠",
+    "head":"音符开始时间为负数",
+    "tail":"音符结束时间超出区段长度",
+    "curve":"参数曲线取值超出[0,256]",
+    "singer":"未知音源",
+    "balance":"左右声道平衡不在balanceread中",
+}
+
+#取值范围为[0,256]的区段参数
+rangedcurves:Tuple[str,...]=("vol","bre","gen")
+
+class Dvissue():
+    '''
+    工程中的一个问题
+    kind:问题类型，见kinds
+    track:音轨序号，int
+    segment:区段序号，音轨的问题为None
+    note:音符在区段中的序号，区段或音轨的问题为None
+    value:问题的相关数据
+        unsorted:前一个音符的开始时间
+        overlap:(与之重叠的音符序号,重叠长度)
+        head,tail:(开始时间,结束时间)
+        curve:(曲线名,超出范围的点数,最小值,最大值)
+        singer:音源名
+        balance:文件中的二进制数据bytes，或无法保存的左右声道平衡int
+    '''
+    __slots__=("kind","track","segment","note","value")
+
+    def __init__(self,kind:str,track:int,segment:int=None,note:int=None,value=None):
+        self.kind:str=kind
+        self.track:int=track
+        self.segment:int=segment
+        self.note:int=note
+        self.value=value
+
+    def __str__(self):
+        place="track {}".format(self.track)
+        if(self.segment is not None):
+            place+=" segment {}".format(self.segment)
+        if(self.note is not None):
+            place+=" note {}".format(self.note)
+        return "{}: {} {}".format(place,kinds[self.kind],self.value)
+
+    def __repr__(self):
+        return "Dvissue({!r},{!r},{!r},{!r},{!r})".format(self.kind,self.track,self.segment,self.note,self.value)
+
+    def __eq__(self,other):
+        return isinstance(other,Dvissue) and (self.kind,self.track,self.segment,self.note,self.value)==(other.kind,other.track,other.segment,other.note,other.value)
+
+def scannotes(block)->Tuple[numpy.ndarray,numpy.ndarray,numpy.ndarray]:
+    '''
+    从尚未解码的音符列表数据块中只读取每个音符的(开始时间,长度,音高)，不生成Dvnote对象
+    block:Skblock，见Dvsegment.noteblock
+    '''
+    head=struct.Struct("<4i")
+    one=struct.Struct("<i")
+    buf=block.buf
+    pos=block.start
+    (n,)=one.unpack_from(buf,pos)
+    pos+=4
+    start=numpy.zeros(n,dtype=numpy.int64)
+    length=numpy.zeros(n,dtype=numpy.int64)
+    notenum=numpy.zeros(n,dtype=numpy.int64)
+    for i in range(n):
+        (start[i],length[i],notenum[i],viblen)=head.unpack_from(buf,pos)
+        pos+=16
+        pos+=4+one.unpack_from(buf,pos)[0]#拼音
+        pos+=4+one.unpack_from(buf,pos)[0]#汉字
+        pos+=1
+        pos+=4+one.unpack_from(buf,pos)[0]#数据块1
+        pos+=4+one.unpack_from(buf,pos)[0]+18#数据块2，音素
+        pos+=20#弯曲深度，弯曲长度，尾部滑音长度，头部滑音长度，音阶
+        pos+=4+one.unpack_from(buf,pos)[0]+4#交叉拼音，交叉音阶
+    return (start,length,115-notenum)
+
+def segmentnotes(seg)->Tuple[numpy.ndarray,numpy.ndarray,numpy.ndarray]:
+    #返回区段中音符的(开始时间,长度,音高)，尚未解码的音符列表直接扫描源数据，不解码
+    if(seg._note is None):
+        return scannotes(seg.noteblock)
+    return notecolumns(seg.note)
+
+def notecolumns(note)->Tuple[numpy.ndarray,numpy.ndarray,numpy.ndarray]:
+    #返回音符列表的(开始时间,长度,音高)，Dvnotetable直接使用其中的列，不复制
+    from dvfile import Dvnotetable
+    if(isinstance(note,Dvnotetable)):
+        return (note.start,note.length,note.notenum)
+    n=len(note)
+    return tuple(numpy.fromiter(map(operator.attrgetter(name),note),numpy.int64,n) for name in ("start","length","notenum"))
+
+def checknotes(seg,track:int,segment:int)->List[Dvissue]:
+    '''
+    检查区段中的音符：是否排序、是否重叠、是否超出区段
+    '''
+    issues=[]
+    (start,length,notenum)=segmentnotes(seg)
+    n=len(start)
+    if(n==0):
+        return issues
+    end=start+length
+    #未排序
+    unsorted=numpy.flatnonzero(start[1:]<start[:-1])+1
+    for i in unsorted.tolist():
+        issues.append(Dvissue("unsorted",track,segment,i,int(start[i-1])))
+    #重叠：按开始时间排序后，与之前所有音符的最大结束时间比较
+    if(len(unsorted)):
+        order=numpy.lexsort((notenum,start))
+    else:
+        order=numpy.arange(n)
+    s=start[order]
+    e=end[order]
+    reach=numpy.maximum.accumulate(e)
+    #reach由哪个音符达到
+    reacher=numpy.maximum.accumulate(numpy.where(e==reach,numpy.arange(n),0))
+    for i in numpy.flatnonzero(reach[:-1]>s[1:]).tolist():
+        issues.append(Dvissue("overlap",track,segment,int(order[i+1]),(int(order[reacher[i]]),int(reach[i]-s[i+1]))))
+    #超出区段
+    for i in numpy.flatnonzero(start<0).tolist():
+        issues.append(Dvissue("head",track,segment,i,(int(start[i]),int(end[i]))))
+    for i in numpy.flatnonzero(end>seg.length).tolist():
+        issues.append(Dvissue("tail",track,segment,i,(int(start[i]),int(end[i]))))
+    return issues
+
+def checkcurves(seg,track:int,segment:int)->List[Dvissue]:
+    '''
+    检查区段参数vol、bre、gen的取值是否在[0,256]中
+    '''
+    issues=[]
+    for name in rangedcurves:
+        y=getattr(seg,name).y
+        bad=(y<0)|(y>256)
+        if(bad.any()):
+            issues.append(Dvissue("curve",track,segment,None,(name,int(bad.sum()),int(y.min()),int(y.max()))))
+    return issues
+
+def checkbalance(tr,track:int)->List[Dvissue]:
+    '''
+    检查音轨的左右声道平衡能否读写
+    从文件读取且未修改平衡的音轨检查文件中的二进制数据，其余音轨检查balance能否写入文件
+    '''
+    from dvfile.data import balanceread,balancewrite
+    if(tr.sourceblock is not None):
+        r=tr.sourceblock.reader()
+        r.skip(4)#tracktype
+        (r.readstr(),r.readbool(),r.readbool(),r.readint())#音轨名，静音，独奏，音量
+        raw=bytes(r.buf[r.pos:r.pos+4])
+        if(tr.balance==balanceread.get(raw,0)):
+            if(raw in balanceread):
+                return []
+            return [Dvissue("balance",track,None,None,raw)]
+    if(tr.balance in balancewrite):
+        return []
+    return [Dvissue("balance",track,None,None,tr.balance)]
+
+def lint(d,singers=None)->List[Dvissue]:
+    '''
+    检查dv工程，返回问题列表，不修改工程
+    d:Dvfile，或dv文件数据（支持缓冲区协议的任意对象，如bytes、mmap）
+        检查文件数据或延迟解码的工程时，音符只扫描开始时间、长度与音高，不解码
+    singers:已知音源，SingerRegistry或音源名集合，为None时不检查音源
+    例如：
+    for issue in lint(open("myproject.dv","rb").read()):
+        print(issue)
+    '''
+    from dvfile import Dvfile,loaddv
+    if(not isinstance(d,Dvfile)):
+        d=loaddv(d,lazy=True)
+    issues=[]
+    known={}
+    for (i,tr) in enumerate(d.track):
+        issues+=checkbalance(tr,i)
+        for (j,seg) in enumerate(tr.segment):
+            if(singers is not None):
+                if(seg.singer not in known):
+                    known[seg.singer]=seg.singer in singers
+                if(not known[seg.singer]):
+                    issues.append(Dvissue("singer",i,j,None,seg.singer))
+            issues+=checknotes(seg,i,j)
+            issues+=checkcurves(seg,i,j)
+    return issues
@@ -0,0 +1,334 @@
+'''
+不依赖mido的midi文件读写
+写出的文件与mido.MidiFile.save逐字节相同
+读取时单次遍历mid文件数据，音符按列一次性构建为Dvnotetable，默认再转为Dvnote列表
+'''
+import struct
+from typing import List,Dict,Tuple
+
+def writevarlen(buf:bytearray,n:int):
+    '''
+    将非负整数n按midi可变长度整数格式写入buf
+    '''
+    if(n<0):
+        raise ValueError("message time must be non-negative in MIDI file")
+    if(n<0x80):
+        buf.append(n)
+        return
+    b=[n&0x7f]
+    n>>=7
+    while(n):
+        b.append((n&0x7f)|0x80)
+        n>>=7
+    buf.extend(reversed(b))
+
+def writemeta(buf:bytearray,delta:int,metatype:int,data:bytes):
+    '''
+    写入一个meta事件：时间差，0xff，类型，长度，数据
+    '''
+    writevarlen(buf,delta)
+    buf.append(0xff)
+    buf.append(metatype)
+    writevarlen(buf,len(data))
+    buf.extend(data)
+
+def encodetext(text:str)->bytes:
+    '''
+    meta事件文本编码，与mido相同使用latin1，无法编码时（如汉字）使用utf-8
+    '''
+    try:
+        return text.encode("latin1")
+    except UnicodeEncodeError:
+        return text.encode("utf-8")
+
+def bpm2tempo(bpm:float)->int:
+    '''
+    曲速转换为每拍微秒数，与mido.bpm2tempo相同
+    '''
+    return int(round(60*1e6/bpm))
+
+def trackchunk(body:bytearray)->bytes:
+    '''
+    在音轨事件数据前加上MTrk头
+    '''
+    return b"MTrk"+struct.pack(">L",len(body))+bytes(body)
+
+def tempotrack(tempo:list)->bytearray:
+    '''
+    生成控制轨（音轨名与曲速事件）的事件数据
+    '''
+    buf=bytearray()
+    writemeta(buf,0,0x03,b"Control")
+    tick=0
+    for (t,bpm) in tempo:
+        writemeta(buf,t-tick,0x51,bpm2tempo(bpm).to_bytes(3,"big"))
+        tick=t
+    writemeta(buf,0,0x2f,b"")
+    return buf
+
+def segmenttrack(seg,use_hanzi:bool=False)->bytearray:
+    '''
+    生成dv区段对应的midi音轨事件数据，与Dvsegment.to_midi_track相同
+    每个音符为：歌词，note_on，note_off
+    '''
+    buf=bytearray()
+    lyriccache:Dict[str,bytes]={}
+    time=0
+    for note in seg.note:
+        lyric=note.hanzi if use_hanzi else note.pinyin
+        text=lyriccache.get(lyric)
+        if(text is None):
+            text=encodetext(lyric)
+            lyriccache[lyric]=text
+        notenum=int(note.notenum)
+        if(not 0<=notenum<128):
+            raise ValueError("data byte must be in range 0..127")
+        writemeta(buf,int(note.start)-time,0x05,text)
+        buf.extend((0x00,0x90,notenum,64))
+        writevarlen(buf,int(note.length))
+        buf.extend((0x80,notenum,64))
+        time=int(note.start)+int(note.length)
+    writemeta(buf,0,0x2f,b"")
+    return buf
+
+def writemidi(file,tempo:list,segments:list,use_hanzi:bool=False,ticks_per_beat:int=480):
+    '''
+    将曲速列表与若干dv区段写成type 1 midi文件
+    file:可写的二进制文件对象
+    tempo:曲速列表[(tick,bpm)]，写入第一轨（控制轨）
+    segments:每个区段写成一个音轨
+    每个音轨生成后立即写出，不构建mido对象
+    '''
+    file.write(b"MThd"+struct.pack(">LHHH",6,1,len(segments)+1,ticks_per_beat))
+    file.write(trackchunk(tempotrack(tempo)))
+    for seg in segments:
+        file.write(trackchunk(segmenttrack(seg,use_hanzi)))
+
+class Miditrack():
+    '''
+    导入时从一个midi音轨中收集到的音符
+    name:音轨名，str
+    tick:音轨总长度，midi tick，int
+    start,end,notenum,lyrics:按note_on顺序排列的音符开始时间、结束时间、音高、歌词，结束时间为-1表示音符没有结束
+    同一通道同一音高的音符重叠时，note_off按先开始先结束配对
+    '''
+    def __init__(self):
+        self.name:str=""
+        self.tick:int=0
+        self.lyric:str=""#当前歌词，属于下一个note_on
+        self.start:List[int]=[]
+        self.end:List[int]=[]
+        self.notenum:List[int]=[]
+        self.lyrics:List[str]=[]
+        self.active:Dict[Tuple[int,int],List[int]]={}#{(通道,音高):[未结束的音符编号]}
+
+    def noteon(self,tick:int,channel:int,notenum:int):
+        self.active.setdefault((channel,notenum),[]).append(len(self.start))
+        self.start.append(tick)
+        self.end.append(-1)
+        self.notenum.append(notenum)
+        self.lyrics.append(self.lyric)
+
+    def noteoff(self,tick:int,channel:int,notenum:int):
+        opened=self.active.get((channel,notenum))
+        if(opened):
+            self.end[opened.pop(0)]=tick
+
+    def tosegment(self,ticks_per_beat:int=480,columnar:bool=False):
+        '''
+        转为dv区段，区段从第1小节（7680）开始，没有结束的音符被丢弃
+        音符表一次性按列构建
+        columnar:为True时区段的音符为Dvnotetable，默认转为Dvnote列表
+        '''
+        import numpy
+        import dvfile
+        start=numpy.array(self.start,dtype=numpy.int64)
+        end=numpy.array(self.end,dtype=numpy.int64)
+        keep=numpy.flatnonzero(end>=0)
+        start=start[keep]
+        end=end[keep]
+        lyrics=[self.lyrics[i] for i in keep]
+        note=dvfile.Dvnotetable.fromcolumns(start=(start*480/ticks_per_beat).astype(numpy.int64),
+                                            length=((end-start)*480/ticks_per_beat).astype(numpy.int64),
+                                            notenum=numpy.array(self.notenum,dtype=numpy.int64)[keep],
+                                            pinyin=lyrics,
+                                            hanzi=lyrics)
+        if(not columnar):
+            note=note.tolist()
+        return dvfile.Dvsegment(start=7680,length=int(self.tick*480/ticks_per_beat),note=note,name=self.name)
+
+def decodetext(data:bytes)->str:
+    '''
+    meta事件文本解码，先尝试utf-8，失败时与mido相同使用latin1
+    '''
+    try:
+        return bytes(data).decode("utf-8")
+    except UnicodeDecodeError:
+        return bytes(data).decode("latin1")
+
+def readvarlen(data:bytes,pos:int)->Tuple[int,int]:
+    '''
+    从data[pos]读取midi可变长度整数，返回(整数,新位置)
+    '''
+    n=0
+    while(True):
+        b=data[pos]
+        pos+=1
+        n=(n<<7)|(b&0x7f)
+        if(b<0x80):
+            return (n,pos)
+
+def readtrack(data:bytes,pos:int,end:int,tempo:list,timesig:list)->Miditrack:
+    '''
+    解析data[pos:end]中的一个MTrk音轨，单次遍历
+    曲速事件(tick,每拍微秒数)追加到tempo，拍号事件(tick,分子,分母)追加到timesig
+    '''
+    tr=Miditrack()
+    named=False
+    tick=0
+    status=0
+    while(pos<end):
+        #时间差
+        b=data[pos]
+        pos+=1
+        delta=b&0x7f
+        while(b&0x80):
+            b=data[pos]
+            pos+=1
+            delta=(delta<<7)|(b&0x7f)
+        tick+=delta
+        b=data[pos]
+        if(b>=0xf0):#meta事件与系统独占事件，不影响running status
+            pos+=1
+            metatype=-1
+            if(b==0xff):
+                metatype=data[pos]
+                pos+=1
+            elif(b not in (0xf0,0xf7)):
+                raise ValueError("invalid status byte {:#x} in MIDI file".format(b))
+            (length,pos)=readvarlen(data,pos)
+            payload=data[pos:pos+length]
+            pos+=length
+            if(metatype==0x2f):#end_of_track
+                break
+            elif(metatype==0x05):#lyrics
+                tr.lyric=decodetext(payload)
+            elif(metatype==0x03 and not named):#track_name
+                tr.name=decodetext(payload)
+                named=True
+            elif(metatype==0x51):#set_tempo
+                tempo.append((tick,int.from_bytes(payload,"big")))
+            elif(metatype==0x58):#time_signature
+                timesig.append((tick,payload[0],2**payload[1]))
+            continue
+        if(b&0x80):
+            status=b
+            pos+=1
+        elif(status==0):
+            raise ValueError("running status without last status in MIDI file")
+        kind=status&0xf0
+        if(kind in (0xc0,0xd0)):
+            pos+=1
+            continue
+        notenum=data[pos]
+        velocity=data[pos+1]
+        pos+=2
+        if(kind==0x90 and velocity>0):
+            tr.noteon(tick,status&0x0f,notenum)
+        elif(kind==0x80 or kind==0x90):
+            tr.noteoff(tick,status&0x0f,notenum)
+    tr.tick=tick
+    return tr
+
+def readmidi(data:bytes)->Tuple[int,List[Miditrack],list,list]:
+    '''
+    解析mid文件内容，不需要mido
+    返回：(每拍tick数,音轨列表,曲速事件[(tick,每拍微秒数)],拍号事件[(tick,分子,分母)])
+    '''
+    if(bytes(data[:4])!=b"MThd"):
+        raise ValueError("not a MIDI file")
+    (headerlength,fmt,ntracks,division)=struct.unpack_from(">LHHH",data,4)
+    if(division&0x8000):
+        raise ValueError("SMPTE time division is not supported")
+    tracks=[]
+    tempo=[]
+    timesig=[]
+    pos=8+headerlength
+    while(pos+8<=len(data)):
+        chunktype=bytes(data[pos:pos+4])
+        (length,)=struct.unpack_from(">L",data,pos+4)
+        pos+=8
+        if(chunktype==b"MTrk"):
+            tracks.append(readtrack(data,pos,min(pos+length,len(data)),tempo,timesig))
+        pos+=length
+    return (division,tracks,tempo,timesig)
+
+def readmidotrack(mtr,tempo:list=None,timesig:list=None)->Miditrack:
+    '''
+    从mido.MidiTrack中收集音符，曲速与拍号事件追加到tempo与timesig
+    '''
+    tr=Miditrack()
+    tr.name=mtr.name
+    tick=0
+    for msg in mtr:
+        tick+=msg.time
+        msgtype=msg.type
+        if(msgtype=="note_on" and msg.velocity>0):
+            tr.noteon(tick,msg.channel,msg.note)
+        elif(msgtype=="note_off" or msgtype=="note_on"):
+            tr.noteoff(tick,msg.channel,msg.note)
+        elif(msgtype=="lyrics"):
+            tr.lyric=msg.text
+        elif(msgtype=="set_tempo" and tempo is not None):
+            tempo.append((tick,msg.tempo))
+        elif(msgtype=="time_signature" and timesig is not None):
+            timesig.append((tick,msg.numerator,msg.denominator))
+    tr.tick=tick
+    return tr
+
+def tempolist(tempo:list,ticks_per_beat:int=480,offset:int=7680)->List[Tuple[int,float]]:
+    '''
+    将midi曲速事件[(tick,每拍微秒数)]转为dv曲速列表
+    midi的0点对应dv的offset（第1小节），0点的曲速同时作为开头的曲速
+    '''
+    result=[(0,120.0)]
+    for (tick,us) in sorted(tempo,key=lambda x:x[0]):
+        bpm=round(60*1e6/us,2)
+        t=0 if tick==0 else offset+int(tick*480/ticks_per_beat)
+        if(result[-1][0]==t):
+            result[-1]=(t,bpm)
+        elif(result[-1][1]!=bpm):
+            result.append((t,bpm))
+    return result
+
+def beatlist(timesig:list,ticks_per_beat:int=480)->List[Tuple[int,int,int]]:
+    '''
+    将midi拍号事件[(tick,分子,分母)]转为dv节拍列表
+    dv工程开头为4个4/4拍的小节，midi的0点对应第1小节，不在小节线上的拍号从下一小节开始
+    '''
+    result=[(-3,4,4)]
+    bar=1
+    bartick=0
+    (num,den)=(4,4)
+    for (tick,n,d) in sorted(timesig,key=lambda x:x[0]):
+        t=int(tick*480/ticks_per_beat)
+        barlength=1920*num//den
+        bars=max(-((bartick-t)//barlength),0)#向上取整
+        bar+=bars
+        bartick+=bars*barlength
+        (num,den)=(n,d)
+        if(result[-1][0]==bar):
+            result[-1]=(bar,n,d)
+        elif(result[-1][1:]!=(n,d)):
+            result.append((bar,n,d))
+    return result
+
+def todvfile(ticks_per_beat:int,tracks:List[Miditrack],tempo:list,timesig:list,columnar:bool=False):
+    '''
+    将收集到的midi音轨、曲速与拍号转为Dvfile，没有音符的音轨（如控制轨）被忽略
+    columnar:见Miditrack.tosegment
+    '''
+    import dvfile
+    return dvfile.Dvfile(tempo=tempolist(tempo,ticks_per_beat),
+                         beats=beatlist(timesig,ticks_per_beat),
+                         track=[dvfile.Dvtrack(name=tr.name,segment=[tr.tosegment(ticks_per_beat,columnar)]) for tr in tracks if len(tr.start)>0])
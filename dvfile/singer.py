@@ -1,8 +1,13 @@
+# -*- coding: gbk -*-
+import os
+import bisect
 import struct
+import time
+import numpy
 from typing import List,Tuple,Dict
 
 def skreadint(file)->int:
-    return struct.unpack("l",file.read(4))[0]
+    return struct.unpack("<l",file.read(4))[0]
 
 def skreadbytes(file)->bytes:
     return file.read(skreadint(file))
@@ -17,7 +22,7 @@ def skwritebool(n:bool)->bytes:
     return bytes([int(n)])
 
 def skwriteint(n:int)->bytes:
-    return struct.pack("l",n)
+    return struct.pack("<l",n)
 
 def skwritebytes(s:bytes)->bytes:
     return skwriteint(len(s))+s
@@ -28,6 +33,123 @@ def skwritestr(s:str)->bytes:
 def skwritelist(l:list)->bytes:
     return skwritebytes(skwriteint(len(l))+b"".join([bytes(n) for n in l]))
 
+#ֵ
+class Dvpron():
+    '''
+    ķֵ䣬ԴdvtbķбɣҾΪϣ
+    phoneme{:(,Ԫ)}ûиΪ("",Ԫ)
+    source{Ԫ:Դ}
+    vowelsԪϣset
+    voiconǸϣset
+    unvcon帨ϣset
+    indeϣset
+    tailβϣset
+    '''
+    def __init__(self,
+                 symbol:List[Tuple[str,str,str]]=[],
+                 vowel:List[Tuple[str,str]]=[],
+                 voicon:List[str]=[],
+                 unvcon:List[str]=[],
+                 inde:List[str]=[],
+                 tail:List[str]=[]):
+        self.phoneme:Dict[str,Tuple[str,str]]={s[0]:(s[1],s[2]) for s in symbol if len(s)>=3 and s[0]}
+        self.source:Dict[str,str]={v[0]:v[1] for v in vowel if len(v)>=2 and v[0]}
+        self.vowels:set=set(self.source)
+        self.voicon:set=set(voicon)-{""}
+        self.unvcon:set=set(unvcon)-{""}
+        self.inde:set=set(inde)-{""}
+        self.tail:set=set(tail)-{""}
+
+    @staticmethod
+    def of(bank)->"Dvpron":
+        '''
+        DvbankDvtbfileķбɷֵ
+        '''
+        return Dvpron(bank.symbol,bank.vowel,bank.voicon,bank.unvcon,bank.inde,bank.tail)
+
+    def __contains__(self,pinyin:str)->bool:
+        #ƴǷԷڱеڻ
+        return pinyin in self.phoneme or pinyin in self.inde
+
+    def get(self,pinyin:str)->Tuple[str,str]:
+        '''
+        ƴ(,Ԫ)ڱʱNone
+        '''
+        return self.phoneme.get(pinyin)
+
+    def consonantclass(self,consonant:str)->str:
+        '''
+        ظ"voiced"Ǹ"unvoiced"帨""޸ʶĸNone
+        '''
+        if(consonant==""):
+            return ""
+        if(consonant in self.voicon):
+            return "voiced"
+        if(consonant in self.unvcon):
+            return "unvoiced"
+        return None
+
+    def check(self,d,use_hanzi:bool=False,ignore:set={"-"})->List[Tuple[int,int,int,str]]:
+        '''
+        ֵ鹤ĸǷԷεԴÿָֻһ
+        ÿεԴʹcheckpron
+        dDvfile
+        use_hanzi麺ָʣĬΪFalseƴ
+        ignoreĸʣĬΪ{"-"}
+        أܷ[(,,,)]
+        '''
+        known={}
+        result=[]
+        for (i,tr) in enumerate(d.track):
+            for (j,seg) in enumerate(tr.segment):
+                result+=[(i,j,k,l) for (k,l) in self.checksegment(seg,use_hanzi,ignore,known)]
+        return result
+
+    def checksegment(self,seg,use_hanzi:bool=False,ignore:set={"-"},known:Dict[str,bool]=None)->List[Tuple[int,str]]:
+        '''
+        ĸǷԷ
+        known{:ǷԷ}ιͬһֵʱÿָֻһ
+        أܷ[(,)]
+        '''
+        from dvfile import Dvnotetable
+        if(known is None):
+            known={}
+        def ok(lyric:str)->bool:
+            r=known.get(lyric)
+            if(r is None):
+                r=known[lyric]=(lyric in ignore or lyric in self)
+            return r
+        note=seg.note
+        if(isinstance(note,Dvnotetable)):
+            code=note.getlyric(use_hanzi)
+            bad=numpy.flatnonzero(~numpy.array([ok(l) for l in note.lyrics],dtype=bool)[code])
+            return [(k,note.lyrics[code[k]]) for k in bad.tolist()]
+        lyrics=[n.hanzi for n in note] if use_hanzi else [n.pinyin for n in note]
+        return [(k,l) for (k,l) in enumerate(lyrics) if not ok(l)]
+
+def checkpron(d,singers,use_hanzi:bool=False,ignore:set={"-"})->List[Tuple[int,int,int,str]]:
+    '''
+    ÿεԴ鹤ĸǷԷÿԴֻһΣÿԴÿָֻһ
+    dDvfile
+    singersԴSingerRegistry{Դ:Dvbank}ҲԴβ飨lintδ֪Դ
+    use_hanzi麺ָʣĬΪFalseƴ
+    ignoreĸʣĬΪ{"-"}
+    أܷ[(,,,)]
+    磺checkpron(d,SingerRegistry("D:/DeepVocal/voice"))
+    '''
+    prons={}#Դ:(ֵ,{:ǷԷ})ҲԴʱΪNone
+    result=[]
+    for (i,tr) in enumerate(d.track):
+        for (j,seg) in enumerate(tr.segment):
+            if(seg.singer not in prons):
+                bank=singers.get(seg.singer)
+                prons[seg.singer]=None if bank is None else (bank.pron(),{})
+            if(prons[seg.singer] is None):
+                continue
+            (pron,known)=prons[seg.singer]
+            result+=[(i,j,k,l) for (k,l) in pron.checksegment(seg,use_hanzi,ignore,known)]
+    return result
+
 #dvԴ
 class Dvbank():
     '''
@@ -41,6 +163,8 @@ class Dvbank():
     unvcon帨б[str]
     indeб[str]
     tailβб[str]
+    modelģб[(ģ,,ģλ)]ӳٶȡʱΪDvmodeltable
+    proncacheķֵ䣬pron
     '''
     def __init__(self,
                 path:str,
@@ -65,20 +189,168 @@ class Dvbank():
         self.tail:List[str]=tail
         self.pitch:str=pitch
         self.model=model
-    
-def openvb(path:str)->Dvbank:
+        self.proncache:Dvpron=None
+
+    def pron(self)->Dvpron:
+        '''
+        رķֵ䣬һεʱɣ޸ķб轫proncacheΪNone
+        '''
+        if(self.proncache is None):
+            self.proncache=Dvpron.of(self)
+        return self.proncache
+
+    def phonemes(self)->Dict[str,Tuple[str,...]]:
+        '''
+        ƴصֵ䣬{:(,Ԫ)}ûиΪ("",Ԫ)Dvpron
+        '''
+        return self.pron().phoneme
+
+def findsksd(path:str)->str:
+    '''
+    Դļеsksdļ·ûʱNone
+    '''
+    for filename in os.listdir(path):
+        if(filename.endswith(".sksd")):
+            return os.path.join(path,filename)
+    return None
+
+def bankmtime(path:str,sksd:str=None)->Tuple[int,int]:
+    #Դ޸ʱ䣺(sksd޸ʱ,SKI޸ʱ)жϻǷʧЧsksdΪNoneʱļв
+    if(sksd is None):
+        sksd=findsksd(path) or os.path.join(path,"voice.sksd")
+    return (os.stat(sksd).st_mtime_ns,os.stat(os.path.join(path,"SKI")).st_mtime_ns)
+
+class Dvmodeltable():
+    '''
+    SKIģбӳٶȡԵ[(ģ,,ģλ)]ʹ
+    SKIֻӳһΣһηʱɨһģбĿƫģ
+    ֮±ꡢģײʱֻҪĿ
+    filenameSKIļ
+    offsetģбSKIеʼλ
+    '''
+    def __init__(self,filename:str,offset:int):
+        import mmap
+        with open(filename,"rb") as file:
+            self.buf=mmap.mmap(file.fileno(),0,access=mmap.ACCESS_READ)
+        self.offset:int=offset
+        self.entry:List[int]=None#Ŀƫ
+        self.pointer:List[int]=None#ģ͵λ
+        self.nameindex:Dict[str,int]=None#ģ±꣬ʱȡһ
+        self.pitchindex:Dict[str,List[int]]=None#׵±б
+        self.sortedpointer:List[int]=None#ȥغλãȷģݵĳ
+
+    def scan(self):
+        '''
+        ηģбĸĿ(ƫ,ģ,,ģλ)
+        ÿĿΪ4ֽڣ4ֽ0ģףģλã4ֽ0
+        '''
+        buf=self.buf
+        end=len(buf)
+        unpack=struct.unpack_from
+        pos=self.offset
+        while(pos+12<=end):
+            p=pos+8
+            (n,)=unpack("<l",buf,p)
+            name=str(buf[p+4:p+4+n],encoding="utf8",errors="replace")
+            p+=4+n
+            (n,)=unpack("<l",buf,p)
+            pitch=str(buf[p+4:p+4+n],encoding="utf8",errors="replace")
+            p+=4+n
+            if(p+8>end):#Ŀ
+                break
+            yield (pos,name,pitch,unpack("<l",buf,p)[0])
+            pos=p+8
+
+    def buildindex(self):
+        '''
+        ɨģбѽʱֱӷ
+        '''
+        if(self.entry is not None):
+            return self
+        entry=[]
+        pointer=[]
+        nameindex={}
+        pitchindex={}
+        for (i,(pos,name,pitch,mpointer)) in enumerate(self.scan()):
+            nameindex.setdefault(name,i)
+            pitchindex.setdefault(pitch,[]).append(i)
+            entry.append(pos)
+            pointer.append(mpointer)
+        self.entry=entry
+        self.pointer=pointer
+        self.nameindex=nameindex
+        self.pitchindex=pitchindex
+        self.sortedpointer=sorted(set(pointer))
+        return self
+
+    def tolist(self)->List[Tuple[str,str,int]]:
+        '''
+        ɨһģб[(ģ,,ģλ)]
+        '''
+        return [i[1:] for i in self.scan()]
+
+    def __len__(self):
+        return len(self.buildindex().entry)
+
+    def __getitem__(self,i:int)->Tuple[str,str,int]:
+        '''
+        صiģͣ(ģ,,ģλ)
+        '''
+        self.buildindex()
+        if(isinstance(i,slice)):
+            return [self[j] for j in range(*i.indices(len(self.entry)))]
+        p=self.entry[i]+8
+        (n,)=struct.unpack_from("<l",self.buf,p)
+        name=str(self.buf[p+4:p+4+n],encoding="utf8",errors="replace")
+        p+=4+n
+        (n,)=struct.unpack_from("<l",self.buf,p)
+        pitch=str(self.buf[p+4:p+4+n],encoding="utf8",errors="replace")
+        return (name,pitch,self.pointer[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def find(self,name:str)->Tuple[str,str,int]:
+        '''
+        ģģͣҲʱNone
+        '''
+        i=self.buildindex().nameindex.get(name)
+        return None if i is None else self[i]
+
+    def bypitch(self,pitch:str)->List[Tuple[str,str,int]]:
+        '''
+        Ϊpitchģ
+        '''
+        return [self[i] for i in self.buildindex().pitchindex.get(pitch,[])]
+
+    def blob(self,model)->memoryview:
+        '''
+        ģݣΪSKIӳڴϵֻmemoryview
+        modelģ±(ģ,,ģλ)
+        ݴģλÿʼһģ͵λãļĩβΪֹ
+        '''
+        self.buildindex()
+        if(isinstance(model,str)):
+            model=self.nameindex[model]
+        if(isinstance(model,tuple)):
+            start=model[2]
+        else:
+            start=self.pointer[model]
+        i=bisect.bisect_right(self.sortedpointer,start)
+        end=self.sortedpointer[i] if i<len(self.sortedpointer) else len(self.buf)
+        return memoryview(self.buf)[start:end]
+
+def openvb(path:str,lazy:bool=False)->Dvbank:
     '''
     dvԴDvbank
     Ŀǰ֧汾6.1  6.0  5.1  4.02
+    lazyǷӳٶȡģбĬΪFalseΪTrueʱDvbank.modelΪDvmodeltable
     '''
-    import os
     import json
+    from dvfile import deleteemptystr
     #sksd
-    sksdname="voice.sksd"
-    for filename in os.listdir(path):
-        if(filename.endswith(".sksd")):
-            sksdname=os.path.join(path,filename)
-            break
+    sksdname=findsksd(path) or os.path.join(path,"voice.sksd")
     with open(sksdname,encoding="utf-8-sig") as sksdfile:
         sksd=json.load(sksdfile)
     name=sksd["name"]
@@ -129,13 +401,9 @@ def openvb(path:str)->Dvbank:
             pitch=skreadstr(skifile)#ǴףĿǰȷ
             skifile.read(56)
             #dvģб
-            while(len(skifile.read(4))==4):
-                skifile.read(4)#0
-                mname=skreadstr(skifile)
-                mpitch=skreadstr(skifile)
-                mpointer=skreadint(skifile)
-                skifile.read(4)#0
-                model.append((mname,mpitch,mpointer))
+            model=Dvmodeltable(skifile.name,skifile.tell())
+            if(not lazy):
+                model=model.tolist()
     return Dvbank(os.path.abspath(path),
                 name,
                 version,
@@ -148,3 +416,122 @@ def openvb(path:str)->Dvbank:
                 pitch,
                 model)
 
+
+class SingerRegistry():
+    '''
+    dvԴɨԴĿ¼һΣ֮ԴԴΪO(1)ļϵͳ
+    򿪵Dvbank󱻻棬ϴμ鳬intervalʱ¼sksdSKI޸ʱ䣬޸ĺԶ´
+    rootԴĿ¼ÿsksdļļΪһԴ
+    pathԴԴ·ֵ䣬ԴΪsksdеnameļҲΪԴ
+    sksdԴ·sksdļ·ֵ
+    cacheѴ򿪵Դ{Դ·:(޸ʱ,Dvbank,ʱ)}
+    lazyǷӳٶȡģбopenvb
+    intervalԶĿ¼ԴǷ޸ĵ̼룬ΪNoneʱֻڵrefreshʱ
+    '''
+    def __init__(self,root:str,lazy:bool=False,interval:float=1.0):
+        self.root:str=os.path.abspath(root)
+        self.lazy:bool=lazy
+        self.interval:float=interval
+        self.path:Dict[str,str]={}
+        self.sksd:Dict[str,str]={}
+        self.cache:Dict[str,Tuple[Tuple[int,int],Dvbank,float]]={}
+        self.rootmtime:int=None
+        self.rootchecked:float=None
+        self.scan()
+
+    def scan(self):
+        '''
+        ɨԴĿ¼ֻȡԴsksd
+        '''
+        import json
+        self.rootmtime=os.stat(self.root).st_mtime_ns
+        self.rootchecked=time.monotonic()
+        dirnames={}
+        names={}
+        sksd={}
+        for entry in sorted(os.scandir(self.root),key=lambda e:e.name):
+            if(not entry.is_dir()):
+                continue
+            sksdname=findsksd(entry.path)
+            if(sksdname is None):
+                continue
+            dirnames[entry.name]=entry.path
+            sksd[entry.path]=sksdname
+            try:
+                with open(sksdname,encoding="utf-8-sig") as sksdfile:
+                    names.setdefault(json.load(sksdfile)["name"],entry.path)
+            except (OSError,ValueError,KeyError):#sksdʱֻܰļ
+                continue
+        dirnames.update(names)
+        self.path=dirnames
+        self.sksd=sksd
+        return self
+
+    def expired(self,checked:float)->bool:
+        #ϴμcheckedǷѳinterval
+        return checked is None or (self.interval is not None and time.monotonic()-checked>=self.interval)
+
+    def refresh(self):
+        '''
+        Ŀ¼Ѵ򿪵ԴǷ޸ģĿ¼޸ʱɨ裬޸ĵԴ´βʱ´
+        '''
+        if(os.stat(self.root).st_mtime_ns!=self.rootmtime):
+            self.scan()
+        self.rootchecked=time.monotonic()
+        for (path,(mtime,bank,checked)) in list(self.cache.items()):
+            self.cache[path]=(mtime,bank,None)
+        return self
+
+    def names(self)->List[str]:
+        '''
+        пõԴļ
+        '''
+        return list(self.path)
+
+    def find(self,singer:str)->str:
+        '''
+        Դ·ҲʱNone
+        ҲҾϴμ鳬intervalʱĿ¼Ƿɨ޸ģԴ޸ʱɨһ
+        '''
+        path=self.path.get(singer)
+        if(path is None and self.expired(self.rootchecked)):
+            self.rootchecked=time.monotonic()
+            if(os.stat(self.root).st_mtime_ns!=self.rootmtime):
+                path=self.scan().path.get(singer)
+        return path
+
+    def get(self,singer:str)->Dvbank:
+        '''
+        ԴӦDvbankҲʱNone
+        '''
+        path=self.find(singer)
+        if(path is None):
+            return None
+        cached=self.cache.get(path)
+        if(cached is not None and not self.expired(cached[2])):
+            return cached[1]
+        try:
+            mtime=bankmtime(path,self.sksd.get(path))
+        except OSError:#sksdɾʱ²
+            mtime=bankmtime(path)
+        if(cached is None or cached[0]!=mtime):
+            cached=(mtime,openvb(path,self.lazy),time.monotonic())
+        else:
+            cached=(mtime,cached[1],time.monotonic())
+        self.cache[path]=cached
+        return cached[1]
+
+    def __contains__(self,singer:str)->bool:
+        return self.find(singer) is not None
+
+    def __getitem__(self,singer:str)->Dvbank:
+        bank=self.get(singer)
+        if(bank is None):
+            raise KeyError(singer)
+        return bank
+
+    def phonemes(self,singer:str)->Dict[str,Tuple[str,...]]:
+        '''
+        Դƴֵ䣬Dvbank.phonemes
+        '''
+        return self[singer].phonemes()
@@ -26,7 +26,8 @@ REQUIRED = ["numpy"]
 EXTRAS = {
     "export midi":["mido"],
     "export sheet":["music21","utaufile"],
-    "export ust and nn":["utaufile"]
+    "export ust and nn":["utaufile"],
+    "hanzi to pinyin":["pypinyin"]
     }
 
 # The rest you shouldn't have to touch too much :)
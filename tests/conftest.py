@@ -0,0 +1,14 @@
+#测试公用的夹具：直接从源码目录导入dvfile，使用docs中的示例工程
+import os
+import sys
+import pytest
+
+root=os.path.join(os.path.dirname(os.path.abspath(__file__)),"..")
+sys.path.insert(0,root)
+
+#示例工程
+samples=[os.path.join(root,"docs",name) for name in ("zhiyaopingfan.dv","zhiyaopingfan2.dv","zhiyaopingfan3.dv")]
+
+@pytest.fixture(params=samples,ids=os.path.basename)
+def sample(request)->str:
+    return request.param
@@ -0,0 +1,60 @@
+#参考实现：dvfile 0.2.0的Dvsegment.basicpitch，用于检查按列批量计算的basicpitch结果不变
+#与原版相比只有两处改动：numpy.int改为int（新版numpy已删除numpy.int），颤音曲线为空的音符不计算颤音（原版numpy.interp报错）
+import math
+import numpy
+
+def basicpitch(self,tempolist):
+    """
+    计算音轨的基础音高曲线
+    """
+    #暂不支持变速曲
+    tempo=tempolist[0][1]
+    tps=8*tempo
+    bp=numpy.zeros(self.length)
+    #有音符部分的基本音高
+    for n in self.note:
+        bp[n.start:n.start+n.length]=100*n.notenum
+    #开头、结尾
+    bp[0:self.note[0].start]=100*self.note[0].notenum
+    bp[self.note[-1].start:]=100*self.note[-1].notenum
+    #滑音
+    #dv滑音机制：
+    #0~100，80为0.25s，最大不超过音符长度一半
+    def por(deltax,y1,y2):
+        ls=numpy.linspace(-math.pi/2,math.pi/2,num=deltax,endpoint=False)
+        p=((y1+y2)/2+(y2-y1)/2*numpy.sin(ls))
+        return p
+    
+    for i in range(len(self.note)-1):
+        lastnote=self.note[i]
+        nextnote=self.note[i+1]
+        porstart=lastnote.start+lastnote.length-min((lastnote.length//2,int(0.025*lastnote.portail*tempo)))
+        porend=nextnote.start+min((nextnote.length//2,int(0.025*nextnote.porhead*tempo)))
+        bp[porstart:porend]=por(porend-porstart,lastnote.notenum*100,nextnote.notenum*100).astype(int)
+    #弯音
+    #dv弯音机制：
+    #弯曲段长度受benlen控制，benlen<50时，长度为0.375s。benlen>50时，长度线性变化。benlen=100时，长度为0.6875s
+    #前段为直线，从(0,0)到(x,-y)其中x=0.09375s，不超过音符长度一半，
+    #y=bendep*0.03
+    #后段为正弦曲线
+    def ben(length,benlen,bendep):
+        x1=min((length//2,int(0.09375*tps)))
+        if(benlen<=50):
+            x2=int(0.375*tps)
+        else:
+            x2=int((0.0625+benlen*0.006875)*tps)
+        x2=min((length,x2))
+        b=numpy.zeros(length)
+        b[0:x1]=numpy.linspace(0,-1,num=x1,endpoint=False)
+        b[x1:x2]=por(x2-x1,-1,0)
+        b=b*3*bendep
+        return b
+    for n in self.note:
+        bp[n.start:n.start+n.length]+=ben(n.length,n.benlen,n.bendep).astype(int)
+    #颤音
+    for n in self.note:
+        if(len(n.vibp)==0):
+            continue
+        vib=numpy.interp(numpy.linspace(0,n.length-1,num=n.length),n.vibp[:,0]/1000.0*tps,n.vibp[:,1],left=0,right=0)
+        bp[n.start:n.start+n.length]+=vib.astype(int)
+    return bp
@@ -0,0 +1,96 @@
+#磁盘缓存：未命中时解析并写入，命中时不解析，源文件改变或缓存损坏时重新解析，无法写入时不报错
+import os
+import shutil
+import numpy
+import pytest
+import dvfile
+from dvfile import cache
+
+notefields=("start","length","notenum","pinyin","hanzi","benlen","bendep","porhead","portail","timbre","viblen","crolrc","crotim")
+
+def content(d)->list:
+    #工程中用于比较的全部内容，曲线转为列表
+    result=[d.tempo,d.beats,[(i.start,i.length,i.filename,i.name,i.volume,i.mute,i.solo) for i in d.inst]]
+    for tr in d.track:
+        result.append((tr.name,tr.volume,tr.balance,tr.mute,tr.solo))
+        for seg in tr.segment:
+            result.append((seg.start,seg.length,seg.singer)+tuple(numpy.asarray(getattr(seg,name)).tolist() for name in ("vol","pit","bre","gen")))
+            for n in seg.note:
+                result.append(tuple(getattr(n,name) for name in notefields)
+                              +tuple(numpy.asarray(getattr(n,name)).tolist() for name in ("vibamp","vibfre","vibp"))
+                              +(None if n.fixed is None else bytes(n.fixed),))
+    return result
+
+@pytest.fixture
+def source(sample,tmp_path)->str:
+    filename=str(tmp_path/"project.dv")
+    shutil.copy(sample,filename)
+    return filename
+
+def noparse(*args,**kwargs):
+    raise AssertionError("cache hit should not parse the file")
+
+def test_miss_then_hit(source,tmp_path,monkeypatch):
+    cachedir=str(tmp_path/"cache")
+    expected=content(dvfile.opendv(source))
+    assert cache.readcache(source,cachedir) is None
+    assert content(dvfile.opendv(source,cache=cachedir))==expected
+    assert os.path.isfile(cache.cachepath(source,cachedir))
+    monkeypatch.setattr(dvfile,"loaddv",noparse)
+    assert content(dvfile.opendv(source,cache=cachedir))==expected
+
+def test_hit_save(source,tmp_path):
+    #从缓存读取的工程没有源数据，保存后内容不变
+    cachedir=str(tmp_path/"cache")
+    dvfile.opendv(source,cache=cachedir)
+    d=dvfile.opendv(source,cache=cachedir)
+    filename=str(tmp_path/"out.dv")
+    d.save(filename)
+    assert content(dvfile.opendv(filename))==content(dvfile.opendv(source))
+
+def test_source_changed(source,tmp_path):
+    cachedir=str(tmp_path/"cache")
+    dvfile.opendv(source,cache=cachedir)
+    d=dvfile.opendv(source).transpose(1)
+    d.save(source)
+    os.utime(source,ns=(0,0))
+    assert cache.readcache(source,cachedir) is None
+    assert content(dvfile.opendv(source,cache=cachedir))==content(d)
+
+@pytest.mark.parametrize("damage",["magic","header","truncate","empty"])
+def test_corrupt(source,tmp_path,damage):
+    cachedir=str(tmp_path/"cache")
+    dvfile.opendv(source,cache=cachedir)
+    path=cache.cachepath(source,cachedir)
+    data=open(path,"rb").read()
+    if(damage=="magic"):
+        data=b"XXXXXXXX"+data[8:]
+    elif(damage=="header"):
+        data=data[:16]+b"}"+data[17:]
+    elif(damage=="truncate"):
+        data=data[:len(data)//2]
+    else:
+        data=b""
+    open(path,"wb").write(data)
+    assert cache.readcache(source,cachedir) is None
+    #重新解析并写入新的缓存
+    assert content(dvfile.opendv(source,cache=cachedir))==content(dvfile.opendv(source))
+    assert cache.readcache(source,cachedir) is not None
+
+def test_unwritable(source,tmp_path):
+    #缓存目录无法创建时仍能打开工程
+    blocker=tmp_path/"file"
+    blocker.write_bytes(b"")
+    cachedir=str(blocker/"cache")
+    assert content(dvfile.opendv(source,cache=cachedir))==content(dvfile.opendv(source))
+    assert not os.path.exists(cachedir)
+
+def test_evict(tmp_path):
+    cachedir=str(tmp_path/"cache")
+    os.makedirs(cachedir)
+    for (i,size) in enumerate((100,200,300)):
+        path=os.path.join(cachedir,"{}.dvc".format(i))
+        open(path,"wb").write(b"\0"*size)
+        os.utime(path,ns=(i*10**9,i*10**9))
+    cache.evict(cachedir,maxsize=500)
+    assert sorted(os.listdir(cachedir))==["1.dvc","2.dvc"]
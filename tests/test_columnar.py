@@ -0,0 +1,77 @@
+#按列存储：Dvnotetable上的各种操作与Dvnote列表的结果相同
+import copy
+import random
+import pytest
+import dvfile
+
+def messy(sample):
+    #打乱第一个区段：部分音符错位、重叠、超出区段，顺序随机
+    seg=dvfile.opendv(sample).track[0].segment[0]
+    note=list(seg.note)
+    rng=random.Random(1)
+    for n in note[::3]:
+        n.start+=rng.randint(-300,300)
+    note[0].start=-100
+    note[-1].length+=seg.length
+    rng.shuffle(note)
+    seg.note=note
+    return seg
+
+ops={
+    "sort":lambda seg:seg.sort(),
+    "cut":lambda seg:seg.sort().cut(),
+    "fix":lambda seg:seg.fix(),
+    "fixnoteoverlap":lambda seg:seg.fixnoteoverlap(),
+    "quantize":lambda seg:seg.quantize(240),
+    "transpose":lambda seg:seg.transpose(-2),
+    "filter":lambda seg:seg.filter(lambda n:n.notenum%2==0),
+    "filter_vectorized":lambda seg:seg.filter(lambda t:t.notenum%2==0,vectorized=True),
+    "filterout":lambda seg:seg.filterout({"de","-"}),
+}
+
+@pytest.mark.parametrize("name",list(ops))
+def test_op(sample,name):
+    seg=messy(sample)
+    table=copy.deepcopy(seg).columnar()
+    ops[name](seg)
+    ops[name](table)
+    assert isinstance(table.note,dvfile.Dvnotetable)
+    assert bytes(table)==bytes(seg)
+    assert bytes(table.columnar(False))==bytes(seg)
+
+def test_project(sample):
+    d=dvfile.opendv(sample)
+    table=dvfile.opendv(sample).columnar()
+    for x in (d,table):
+        x.quantize(120).transpose(3)
+    assert bytes(table)==bytes(d)
+
+@pytest.mark.parametrize("columnar",[False,True])
+def test_lyrics(sample,columnar):
+    d=dvfile.opendv(sample).columnar(columnar)
+    lyr=d.lyricarray()
+    count=lyr.count()
+    assert sum(count.values())==len(d.track[0].segment[0].note)
+    #替换后相同的歌词合并，计数中不出现0
+    (a,b)=list(count)[:2]
+    lyr.replace({a:b})
+    assert lyr.count()[b]==count[a]+count[b]
+    assert a not in lyr.count()
+    assert len(lyr.lyrics)==len(set(lyr.lyrics))
+    lyr.keep(lyr.mask(lambda l:l!=b))
+    assert 0 not in lyr.count().values()
+
+@pytest.mark.parametrize("columnar",[False,True])
+def test_noteindex(sample,columnar):
+    d=dvfile.opendv(sample).columnar(columnar)
+    tr=d.track[0]
+    seg=tr.segment[0]
+    def expected(t):
+        return [n.start for n in seg.note if seg.start+n.start<=t<seg.start+n.start+n.length]
+    t=seg.start+seg.note[1].start
+    assert [n.start for (s,n) in tr.notes_at(t)]==expected(t)
+    #修改音符后索引自动重建
+    seg.note[1].start+=1
+    assert [n.start for (s,n) in tr.notes_at(t)]==expected(t)
+    seg.note=seg.note[2:]
+    assert [n.start for (s,n) in tr.notes_at(t)]==expected(t)
@@ -0,0 +1,47 @@
+#基础音高曲线：按列批量计算的basicpitch与参考实现（见reference.py）结果相同
+import numpy
+import pytest
+import dvfile
+import reference
+
+def randomsegment(seed:int)->dvfile.Dvsegment:
+    #按顺序排列、不重叠的随机音符，滑音、弯音、颤音参数随机，部分音符没有颤音曲线
+    rng=numpy.random.default_rng(seed)
+    note=[]
+    t=int(rng.integers(0,200))
+    for i in range(int(rng.integers(1,15))):
+        length=int(rng.integers(30,1500))
+        k=int(rng.integers(0,20))
+        vibp=numpy.stack([numpy.sort(rng.integers(0,2000,k)),rng.integers(-100,100,k)],axis=1).astype(numpy.int32)
+        note.append(dvfile.Dvnote(t,length,int(rng.integers(40,80)),"a","a",
+                                  benlen=int(rng.integers(0,101)),
+                                  bendep=int(rng.integers(0,101)),
+                                  porhead=int(rng.integers(0,101)),
+                                  portail=int(rng.integers(0,101)),
+                                  vibp=vibp))
+        t+=length+int(rng.integers(0,300))
+    return dvfile.Dvsegment(0,t+int(rng.integers(0,500)),note=note)
+
+def test_sample(sample):
+    d=dvfile.opendv(sample)
+    seg=d.track[0].segment[0]
+    expected=reference.basicpitch(seg,d.tempo)
+    assert numpy.array_equal(seg.basicpitch(d.tempo),expected)
+    assert numpy.array_equal(seg.basicpitch(d.tempomap()),expected)
+    assert numpy.array_equal(seg.columnar().basicpitch(d.tempo),expected)
+
+@pytest.mark.parametrize("seed",range(50))
+@pytest.mark.parametrize("bpm",[60.0,120.0,174.0])
+def test_random(seed,bpm):
+    seg=randomsegment(seed)
+    expected=reference.basicpitch(seg,[(0,bpm)])
+    assert numpy.array_equal(seg.basicpitch([(0,bpm)]),expected)
+    assert numpy.array_equal(seg.columnar().basicpitch([(0,bpm)]),expected)
+
+def test_empty_vibrato():
+    seg=dvfile.Dvsegment(0,2000,note=[dvfile.Dvnote(0,480,60,"a","a",vibp=numpy.zeros((0,2),dtype=numpy.int32)),
+                                      dvfile.Dvnote(960,480,62,"a","a",vibp=numpy.zeros((0,2),dtype=numpy.int32))])
+    assert numpy.array_equal(seg.basicpitch([(0,120.0)]),reference.basicpitch(seg,[(0,120.0)]))
+
+def test_empty_segment():
+    assert numpy.array_equal(dvfile.Dvsegment(0,100).basicpitch([(0,120.0)]),numpy.zeros(100))
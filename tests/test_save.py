@@ -0,0 +1,57 @@
+#保存：opendv的四种打开方式保存结果相同，未修改的工程原样写回
+import copy
+import shutil
+import pytest
+import dvfile
+
+#opendv的四种打开方式
+modes=[{},{"mmap":True},{"lazy":True},{"mmap":True,"lazy":True}]
+modeids=["default","mmap","lazy","mmap+lazy"]
+
+def edit(d):
+    #修改第一个区段：移调并改一个歌词，其余区段保持不变
+    seg=d.track[0].segment[0]
+    seg.transpose(2)
+    seg.note[0].pinyin="la"
+    return d
+
+@pytest.mark.parametrize("mode",modes,ids=modeids)
+def test_unchanged(sample,mode,tmp_path):
+    filename=str(tmp_path/"out.dv")
+    dvfile.opendv(sample,**mode).save(filename)
+    assert open(filename,"rb").read()==open(sample,"rb").read()
+
+@pytest.mark.parametrize("mode",modes,ids=modeids)
+def test_edited(sample,mode,tmp_path):
+    expected=str(tmp_path/"expected.dv")
+    edit(dvfile.opendv(sample)).save(expected)
+    filename=str(tmp_path/"out.dv")
+    edit(dvfile.opendv(sample,**mode)).save(filename)
+    assert open(filename,"rb").read()==open(expected,"rb").read()
+    d=dvfile.opendv(filename)
+    source=dvfile.opendv(sample)
+    assert d.track[0].segment[0].note[0].pinyin=="la"
+    assert [n.notenum for n in d.track[0].segment[0].note]==[n.notenum+2 for n in source.track[0].segment[0].note]
+
+@pytest.mark.parametrize("lazy",[False,True])
+def test_overwrite_mmap_source(sample,lazy,tmp_path):
+    #覆盖正在被映射的源文件
+    filename=str(tmp_path/"project.dv")
+    shutil.copy(sample,filename)
+    expected=str(tmp_path/"expected.dv")
+    edit(dvfile.opendv(sample)).save(expected)
+    edit(dvfile.opendv(filename,mmap=True,lazy=lazy)).save(filename)
+    assert open(filename,"rb").read()==open(expected,"rb").read()
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")]==[]
+
+def test_vibrato_edit_after_deepcopy(sample,tmp_path):
+    #深复制后原地修改颤音曲线，保存时不能复制源数据
+    d=copy.deepcopy(dvfile.opendv(sample,mmap=True))
+    note=d.track[0].segment[0].note[0]
+    note.vibamp[-1,1]+=1
+    note.vibfre[-1,1]+=1
+    filename=str(tmp_path/"out.dv")
+    d.save(filename)
+    saved=dvfile.opendv(filename).track[0].segment[0].note[0]
+    assert (saved.vibamp==note.vibamp).all()
+    assert (saved.vibfre==note.vibfre).all()